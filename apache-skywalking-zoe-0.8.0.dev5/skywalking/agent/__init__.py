@@ -15,55 +15,104 @@
 # limitations under the License.
 #
 
+import asyncio
 import atexit
 import os
-from queue import Queue, Full
+import sys
+import time
+from queue import Full, Empty
 from threading import Thread, Event
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
-from skywalking import config, plugins
+from skywalking import config, endpoint, plugins
 from skywalking import loggings
 from skywalking import profile
-from skywalking.agent.protocol import Protocol
+from skywalking import sampling
+from skywalking import telemetry
+from skywalking.agent.protocol import Protocol, ProtocolAsync
 from skywalking.command import command_service
 from skywalking.loggings import logger
 from skywalking.profile.profile_task import ProfileTask
 from skywalking.profile.snapshot import TracingThreadSnapshot
 from skywalking.protocol.logging.Logging_pb2 import LogData
+from skywalking.sampling.head_sampler import TokenBucket
+from skywalking.sampling.tail_sampler import TailSampler
+from skywalking.trace.segment import SpilledSegment
+from skywalking.utils.buffer import BoundedBuffer
+from skywalking.utils.scheduler import scheduler
+from skywalking.utils.spill import SpillBuffer
+from skywalking.utils.time import thread_time
 
 if TYPE_CHECKING:
     from skywalking.trace.context import Segment
 
 __started = False
-__protocol = None  # type: Protocol
-__heartbeat_thread = __report_thread = __log_report_thread = __query_profile_thread = __command_dispatch_thread \
-    = __send_profile_thread = __queue = __log_queue = __snapshot_queue = __finished = None
-
-
-def __heartbeat():
-    wait = base = 30
-
-    while not __finished.is_set():
+__protocol = None  # type: Union[Protocol, ProtocolAsync]
+__report_thread = __log_report_thread = __command_dispatch_thread = __send_profile_thread = __queue = __log_queue \
+    = __snapshot_queue = __finished = None
+# the heartbeat and profile command query, which run on the scheduler
+__heartbeat_timer = __query_profile_timer = None
+# the event loop running all reporters when config.asyncio_reporter is set, and the task of the reporters on it
+__loop = __loop_thread = __loop_task = None
+__tail_sampler = None  # type: TailSampler
+__segment_spill = __log_spill = None  # type: SpillBuffer
+# the records overflowing the queues, encoded and written to the spill files on the spill thread, not on the request
+# threads, and the event stopping that thread
+__spill_queue = __spill_thread = __spill_stopped = None
+__replay_bucket = None  # type: TokenBucket
+__backend_ok = True  # whether the last heartbeat and report went through, spilled records are only replayed then
+
+
+def __backoff(target, base: float):
+    """
+    the scheduler counterpart of the reporter thread loops below, calls target and returns the seconds until its next
+    call
+    """
+    wait = base
+
+    def call():
+        nonlocal wait
         try:
-            __protocol.heartbeat()
+            target()
             wait = base  # reset to base wait time on success
         except Exception as exc:
             logger.error(str(exc))
             wait = min(60, wait * 2 or 1)  # double wait time with each consecutive error up to a maximum
+        return wait
 
-        __finished.wait(wait)
+    return call
+
+
+def __heartbeat():
+    global __backend_ok
+    try:
+        __protocol.heartbeat()
+    except Exception:
+        __backend_ok = False
+        raise
+    __backend_ok = True
 
 
 def __report():
+    global __backend_ok
     wait = base = 0
 
     while not __finished.is_set():
+        cpu_start, wall_start = thread_time(), time.monotonic()
         try:
             __protocol.report(__queue)  # is blocking actually, blocks for max config.QUEUE_TIMEOUT seconds
             wait = base
+            if __segment_spill is not None:
+                __replay(__queue, __segment_spill, SpilledSegment)
         except Exception as exc:
+            __backend_ok = False
             logger.error(str(exc))
             wait = min(60, wait * 2 or 1)
+        sampling.sampler.record_report_time(thread_time() - cpu_start, time.monotonic() - wall_start)
+
+        if __tail_sampler is not None:  # release the held traces even when no new segment comes in
+            __tail_sampler.flush()
+        telemetry.drops.flush()
 
         __finished.wait(wait)
 
@@ -75,6 +124,8 @@ def __report_log():
         try:
             __protocol.report_log(__log_queue)
             wait = base
+            if __log_spill is not None:
+                __replay(__log_queue, __log_spill, LogData.FromString)
         except Exception as exc:
             logger.error(str(exc))
             wait = min(60, wait * 2 or 1)
@@ -97,17 +148,145 @@ def __send_profile_snapshot():
 
 
 def __query_profile_command():
-    wait = base = config.get_profile_task_interval
+    __protocol.query_profile_commands()
+
+
+async def __repeat(target, base: float):
+    """
+    the asyncio counterpart of the reporter loops above, awaits target until the agent is finished
+    """
+    wait = base
 
     while not __finished.is_set():
         try:
-            __protocol.query_profile_commands()
+            await target()
             wait = base
         except Exception as exc:
             logger.error(str(exc))
             wait = min(60, wait * 2 or 1)
 
-        __finished.wait(wait)
+        await asyncio.sleep(wait)
+
+
+async def __heartbeat_async():
+    global __backend_ok
+    try:
+        await __protocol.heartbeat()
+    except Exception:
+        __backend_ok = False
+        raise
+    __backend_ok = True
+
+
+async def __report_async():
+    # the thread time of the loop also covers the other reporters it runs in between, close enough for the sampler
+    cpu_start, wall_start = thread_time(), time.monotonic()
+    try:
+        await __protocol.report(__queue)
+        if __segment_spill is not None:
+            __replay(__queue, __segment_spill, SpilledSegment)
+    finally:
+        sampling.sampler.record_report_time(thread_time() - cpu_start, time.monotonic() - wall_start)
+
+        if __tail_sampler is not None:
+            __tail_sampler.flush()
+        telemetry.drops.flush()
+
+
+async def __report_log_async():
+    await __protocol.report_log(__log_queue)
+    if __log_spill is not None:
+        __replay(__log_queue, __log_spill, LogData.FromString)
+
+
+async def __send_profile_snapshot_async():
+    await __protocol.send_snapshot(__snapshot_queue)
+
+
+async def __query_profile_command_async():
+    await __protocol.query_profile_commands()
+
+
+async def __run_async():
+    global __protocol
+    # grpc.aio channels are bound to the loop they are created on
+    from skywalking.agent.protocol.grpc_aio import GrpcProtocolAsync
+    __protocol = GrpcProtocolAsync()
+
+    tasks = [__repeat(__heartbeat_async, 30), __repeat(__report_async, 0)]
+    if config.log_reporter_active:
+        tasks.append(__repeat(__report_log_async, 0))
+    if config.profile_active:
+        tasks.append(__repeat(__query_profile_command_async, config.get_profile_task_interval))
+        tasks.append(__repeat(__send_profile_snapshot_async, 0.5))
+
+    await asyncio.gather(*tasks)
+
+
+def __run_loop():
+    asyncio.set_event_loop(__loop)
+    try:
+        __loop.run_until_complete(__loop_task)
+    except RuntimeError:  # stopped before a fork, the reporters carry on where they were once the loop runs again
+        pass
+
+
+async def __fini_async():
+    await __protocol.report(__queue, False)
+
+    if config.log_reporter_active:
+        await __protocol.report_log(__log_queue, False)
+
+    if config.profile_active:
+        await __protocol.send_snapshot(__snapshot_queue, False)
+
+
+async def __notify_profile_finish_async(task: ProfileTask):
+    await __protocol.notify_profile_task_finish(task)
+
+
+def __replay(queue: BoundedBuffer, spill: SpillBuffer, wrap):
+    """
+    move spilled records back into the queue while the backend is reachable and the queue at most half full, at no
+    more than config.spill_replay_rate records per second
+    """
+    while __backend_ok and queue.qsize() < queue.maxsize // 2 and __replay_bucket.try_acquire():
+        record = spill.get()
+        if record is None:
+            return
+        try:
+            queue.put(wrap(record), block=False)
+        except Full:
+            spill.put(record)
+            return
+
+
+def __spill():
+    while not __spill_stopped.is_set():
+        __write_spill(block=True)
+
+
+def __write_spill(block: bool):
+    """
+    write the overflowing records handed over by archive and archive_log to their spill files until the handoff queue
+    is empty
+    """
+    while True:
+        try:
+            kind, item = __spill_queue.get(block=block, timeout=config.QUEUE_TIMEOUT)
+        except Empty:
+            return
+
+        try:
+            if kind == 'segment':
+                spilled = __segment_spill.put(item.transform().SerializeToString())
+            else:
+                spilled = __log_spill.put(item.SerializeToString())
+        except Exception as exc:
+            logger.error(f'failed to spill a {kind}: {exc}')
+            spilled = False
+        if not spilled:
+            telemetry.drops.record(kind)
 
 
 def __command_dispatch():
@@ -116,37 +295,129 @@ def __command_dispatch():
 
 
 def __init_threading():
-    global __heartbeat_thread, __report_thread, __log_report_thread, __query_profile_thread, \
-        __command_dispatch_thread, __send_profile_thread, __queue, __log_queue, __snapshot_queue, __finished
+    global __command_dispatch_thread, __queue, __log_queue, __snapshot_queue, __tail_sampler, __loop, \
+        __segment_spill, __log_spill, __replay_bucket, __spill_queue
 
-    __queue = Queue(maxsize=config.max_buffer_size)
-    __finished = Event()
-    __heartbeat_thread = Thread(name='HeartbeatThread', target=__heartbeat, daemon=True)
-    __report_thread = Thread(name='ReportThread', target=__report, daemon=True)
+    __queue = BoundedBuffer(maxsize=config.max_buffer_size)
+    if config.tail_sample_active:
+        __tail_sampler = TailSampler(forward=__archive)
     __command_dispatch_thread = Thread(name='CommandDispatchThread', target=__command_dispatch, daemon=True)
+    __command_dispatch_thread.start()
+
+    if config.log_reporter_active:
+        __log_queue = BoundedBuffer(maxsize=config.log_reporter_max_buffer_size)
+    if config.profile_active:
+        __snapshot_queue = BoundedBuffer(maxsize=config.profile_snapshot_transport_buffer_size)
+
+    if config.spill_dir:
+        max_size, file_size = config.spill_max_size << 20, config.spill_file_size << 20
+        __segment_spill = SpillBuffer(config.spill_dir, 'segment', max_size, file_size)
+        if config.log_reporter_active:
+            __log_spill = SpillBuffer(config.spill_dir, 'log', max_size, file_size)
+        __replay_bucket = TokenBucket(config.spill_replay_rate)
+        __spill_queue = BoundedBuffer(maxsize=1024)  # a handoff, the spill thread keeps up unless the disk does not
+
+    telemetry.register_queue('segment', __queue)
+    if __log_queue is not None:
+        telemetry.register_queue('log', __log_queue)
+    if __snapshot_queue is not None:
+        telemetry.register_queue('snapshot', __snapshot_queue)
+    if __spill_queue is not None:
+        telemetry.register_queue('spill', __spill_queue)
+    for name, spill in (('segment_spill', __segment_spill), ('log_spill', __log_spill)):
+        if spill is not None:
+            telemetry.registry.gauge('sw_agent_dropped_total', spill.dropped.get,
+                                     'items dropped because the queue was full', {'queue': name}, type='counter')
+
+    __loop = None
+    __start_reporters()
+
+    if profile.continuous_profiler is not None:
+        profile.continuous_profiler.start()
+
+
+def __start_reporters():
+    global __report_thread, __log_report_thread, __send_profile_thread, __heartbeat_timer, __query_profile_timer, \
+        __finished, __loop, __loop_thread, __loop_task, __spill_thread, __spill_stopped
 
-    __heartbeat_thread.start()
+    __finished = Event()
+    scheduler.start()
+
+    if __spill_queue is not None:
+        __spill_stopped = Event()
+        __spill_thread = Thread(name='SpillThread', target=__spill, daemon=True)
+        __spill_thread.start()
+
+    if config.asyncio_reporter:
+        if __loop is None:
+            __loop = asyncio.new_event_loop()
+            __loop_task = __loop.create_task(__run_async())
+        __loop_thread = Thread(name='AsyncioReporterThread', target=__run_loop, daemon=True)
+        __loop_thread.start()
+        return
+
+    # calls to the backend may block, they run one at a time on the worker of the scheduler
+    __heartbeat_timer = scheduler.schedule(0, __backoff(__heartbeat, 30), period=30, blocking=True)
+    __report_thread = Thread(name='ReportThread', target=__report, daemon=True)
     __report_thread.start()
-    __command_dispatch_thread.start()
 
     if config.log_reporter_active:
-        __log_queue = Queue(maxsize=config.log_reporter_max_buffer_size)
         __log_report_thread = Thread(name='LogReportThread', target=__report_log, daemon=True)
         __log_report_thread.start()
 
     if config.profile_active:
-        __snapshot_queue = Queue(maxsize=config.profile_snapshot_transport_buffer_size)
-
-        __query_profile_thread = Thread(name='QueryProfileCommandThread', target=__query_profile_command, daemon=True)
-        __query_profile_thread.start()
+        interval = config.get_profile_task_interval
+        __query_profile_timer = scheduler.schedule(0, __backoff(__query_profile_command, interval), period=interval,
+                                                   blocking=True)
 
         __send_profile_thread = Thread(name='SendProfileSnapShotThread', target=__send_profile_snapshot, daemon=True)
         __send_profile_thread.start()
 
 
+def __stop_reporters():
+    """
+    stop the reporter threads, waiting for their current call to the backend, the queues are kept as they are
+    """
+    for queue in (__queue, __log_queue, __snapshot_queue, __spill_queue):  # wake up the reporters waiting for items
+        if queue is not None:
+            queue.pause()
+    if __spill_stopped is not None:
+        __spill_stopped.set()
+
+    if config.asyncio_reporter:
+        __loop.call_soon_threadsafe(__loop.stop)
+        threads = [__loop_thread]
+    else:
+        __finished.set()
+        for timer in (__heartbeat_timer, __query_profile_timer):  # scheduled again with the reporters
+            if timer is not None:
+                timer.cancel()
+        threads = [__report_thread, __log_report_thread, __send_profile_thread]
+    threads.append(__spill_thread)
+
+    deadline = time.monotonic() + config.fork_quiesce_timeout
+    for thread in threads:
+        if thread is not None:
+            thread.join(max(deadline - time.monotonic(), 0))
+            if thread.is_alive():
+                logger.warning(f'{thread.name} did not stop in time for fork(), it may hold locks in the child')
+    # profile dumps and task starts and stops resume once the scheduler is started again
+    scheduler.stop(max(deadline - time.monotonic(), 0))
+
+    for queue in (__queue, __log_queue, __snapshot_queue, __spill_queue):
+        if queue is not None:
+            queue.resume()
+
+
 def __init():
     global __protocol
-    if config.protocol == 'grpc':
+    if config.asyncio_reporter and config.protocol != 'grpc':
+        logger.warning(f'the asyncio reporter is not supported with {config.protocol} protocol, using threads')
+        config.asyncio_reporter = False
+
+    if config.asyncio_reporter:
+        pass  # created on the event loop by __run_async
+    elif config.protocol == 'grpc':
         from skywalking.agent.protocol.grpc import GrpcProtocol
         __protocol = GrpcProtocol()
     elif config.protocol == 'http':
@@ -165,6 +436,27 @@ def __init():
 
 
 def __fini():
+    if profile.continuous_profiler is not None:
+        profile.continuous_profiler.stop()
+
+    if __tail_sampler is not None:
+        __tail_sampler.flush(force=True)
+
+    if __spill_queue is not None:  # the overflow not written yet, the spill thread may be writing along
+        __write_spill(block=False)
+    for spill in (__segment_spill, __log_spill):  # left for the next process to replay
+        if spill is not None:
+            spill.flush()
+    telemetry.drops.flush(force=True)
+
+    if config.asyncio_reporter:
+        try:
+            asyncio.run_coroutine_threadsafe(__fini_async(), __loop).result()
+        except Exception as exc:
+            logger.error(str(exc))
+        __finished.set()
+        return
+
     __protocol.report(__queue, False)
     __queue.join()
 
@@ -180,21 +472,36 @@ def __fini():
 
 
 def __fork_before():
-    if config.protocol != 'http':
-        logger.warning(f'fork() not currently supported with {config.protocol} protocol')
-
-    # TODO: handle __queue and __finished correctly (locks, mutexes, etc...), need to lock before fork and unlock after
-    # if possible, or ensure they are not locked in threads (end threads and restart after fork?)
+    # no reporter thread may be inside a lock or a call to the backend while the process is copied
+    __stop_reporters()
+    if profile.continuous_profiler is not None:
+        profile.continuous_profiler.pause()
 
-    __protocol.fork_before()
+    if __protocol is not None:
+        __protocol.fork_before()
 
 
 def __fork_after_in_parent():
-    __protocol.fork_after_in_parent()
+    if __protocol is not None:
+        __protocol.fork_after_in_parent()
+
+    __start_reporters()
+    if profile.continuous_profiler is not None:
+        profile.continuous_profiler.start()
 
 
 def __fork_after_in_child():
-    __protocol.fork_after_in_child()
+    global __protocol
+    if config.asyncio_reporter:  # the loop thread is gone in the child, a new protocol is created on the new loop
+        __protocol = None
+    else:
+        __protocol.fork_after_in_child()
+
+    telemetry.fork_after_in_child()
+    scheduler.fork_after_in_child()
+    if profile.continuous_profiler is not None:
+        profile.continuous_profiler.fork_after_in_child()
+    # the items in the inherited queues are reported by the parent, the child starts over with its own
     __init_threading()
 
 
@@ -204,6 +511,9 @@ def start():
         return
     __started = True
 
+    if config.protocol == 'grpc' and 'grpc' not in sys.modules:  # read by grpc when it is first imported
+        os.environ.setdefault('GRPC_ENABLE_FORK_SUPPORT', 'true')
+
     flag = False
     try:
         from gevent import monkey
@@ -217,6 +527,9 @@ def start():
     loggings.init()
     config.finalize()
     profile.init()
+    sampling.init()
+    endpoint.init()
+    telemetry.init()
 
     __init()
 
@@ -237,32 +550,55 @@ def started():
 
 
 def isfull():
-    return __queue.full()
+    if not __queue.full():
+        return False
+    # overflowing segments are still kept while the spill has room
+    return __segment_spill is None or __segment_spill.full() or __spill_queue.full()
 
 
 def archive(segment: 'Segment'):
-    try:  # unlike checking __queue.full() then inserting, this is atomic
+    if __tail_sampler is not None:
+        __tail_sampler.offer(segment)
+    else:
+        __archive(segment)
+
+
+def __archive(segment: 'Segment'):
+    try:  # never blocks nor takes a lock, request threads don't contend with the report thread
         __queue.put(segment, block=False)
     except Full:
-        logger.warning('the queue is full, the segment will be abandoned')
+        __overflow('segment', segment)
 
 
 def archive_log(log_data: 'LogData'):
     try:
         __log_queue.put(log_data, block=False)
     except Full:
-        logger.warning('the queue is full, the log will be abandoned')
+        __overflow('log', log_data)
+
+
+def __overflow(kind: str, item):
+    # encoding and writing to disk are left to the spill thread, the caller is a request thread
+    try:
+        if __spill_queue is None or (__segment_spill if kind == 'segment' else __log_spill).full():
+            raise Full
+        __spill_queue.put((kind, item), block=False)
+    except Full:
+        telemetry.drops.record(kind)
 
 
 def add_profiling_snapshot(snapshot: TracingThreadSnapshot):
     try:
-        __snapshot_queue.put(snapshot)
+        __snapshot_queue.put(snapshot, block=False)  # dumped on the scheduler thread, which must never wait here
     except Full:
-        logger.warning('the snapshot queue is full, the snapshot will be abandoned')
+        telemetry.drops.record('snapshot')
 
 
 def notify_profile_finish(task: ProfileTask):
     try:
-        __protocol.notify_profile_task_finish(task)
+        if config.asyncio_reporter:
+            asyncio.run_coroutine_threadsafe(__notify_profile_finish_async(task), __loop).result()
+        else:
+            __protocol.notify_profile_task_finish(task)
     except Exception as e:
         logger.error(f'notify profile task finish to backend fail. {str(e)}')
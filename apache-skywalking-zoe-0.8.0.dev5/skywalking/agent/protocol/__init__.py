@@ -16,7 +16,38 @@
 #
 
 from abc import ABC, abstractmethod
-from queue import Queue
+from queue import Queue, Empty
+from time import time
+from typing import List
+
+from skywalking import config
+
+
+def drain(queue: Queue, max_size: int, linger: float, block: bool = True) -> List:
+    """
+    take up to max_size items from the queue, waiting at most linger seconds for more items after the first one
+    """
+    items = []
+    try:
+        items.append(queue.get(block=block, timeout=config.QUEUE_TIMEOUT))
+    except Empty:
+        return items
+
+    deadline = time() + linger
+    while len(items) < max_size:
+        timeout = deadline - time()
+        try:
+            if block and timeout > 0:
+                items.append(queue.get(timeout=timeout))
+            else:  # linger is over, only take what is already there
+                items.append(queue.get_nowait())
+        except Empty:
+            break
+
+    for _ in items:
+        queue.task_done()
+
+    return items
 
 
 class Protocol(ABC):
@@ -49,3 +80,40 @@ class Protocol(ABC):
 
     def notify_profile_task_finish(self, task):
         pass
+
+
+class ProtocolAsync(ABC):
+    """
+    the asyncio counterpart of Protocol, every coroutine is awaited on the single event loop of the reporter thread
+    and must never block it, queues are only polled without waiting
+    """
+
+    def fork_before(self):
+        pass
+
+    def fork_after_in_parent(self):
+        pass
+
+    def fork_after_in_child(self):
+        pass
+
+    @abstractmethod
+    async def heartbeat(self):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def report(self, queue: Queue, block: bool = True):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def report_log(self, queue: Queue, block: bool = True):
+        raise NotImplementedError()
+
+    async def query_profile_commands(self):
+        pass
+
+    async def send_snapshot(self, queue: Queue, block: bool = True):
+        pass
+
+    async def notify_profile_task_finish(self, task):
+        pass
@@ -22,18 +22,16 @@ from time import time
 
 import grpc
 
-from skywalking import config
+from skywalking import config, telemetry
 from skywalking.agent import Protocol
+from skywalking.agent.protocol import drain
 from skywalking.agent.protocol.interceptors import header_adder_interceptor
 from skywalking.client.grpc import GrpcServiceManagementClient, GrpcTraceSegmentReportService, \
     GrpcProfileTaskChannelService, GrpcLogDataReportService
 from skywalking.loggings import logger, logger_debug_enabled
 from skywalking.profile.profile_task import ProfileTask
 from skywalking.profile.snapshot import TracingThreadSnapshot
-from skywalking.protocol.common.Common_pb2 import KeyStringValuePair
-from skywalking.protocol.language_agent.Tracing_pb2 import SegmentObject, SpanObject, Log, SegmentReference
 from skywalking.protocol.logging.Logging_pb2 import LogData
-from skywalking.protocol.profile.Profile_pb2 import ThreadSnapshot, ThreadStack
 from skywalking.trace.segment import Segment
 
 
@@ -41,7 +39,9 @@ class GrpcProtocol(Protocol):
     def __init__(self):
         self.properties_sent = False
         self.state = None
+        self._connect()
 
+    def _connect(self):
         if config.force_tls:
             self.channel = grpc.secure_channel(config.collector_address, grpc.ssl_channel_credentials())
         else:
@@ -58,6 +58,12 @@ class GrpcProtocol(Protocol):
         self.profile_channel = GrpcProfileTaskChannelService(self.channel)
         self.log_reporter = GrpcLogDataReportService(self.channel)
 
+    def fork_after_in_child(self):
+        # the channel of the parent is unusable in the child, grpc fork support only lets new channels be created
+        self.properties_sent = False  # the child reports its own process number
+        self.state = None
+        self._connect()
+
     def _cb(self, state):
         if logger_debug_enabled:
             logger.debug('grpc channel connectivity changed, [%s -> %s]', self.state, state)
@@ -73,11 +79,12 @@ class GrpcProtocol(Protocol):
 
     def heartbeat(self):
         try:
-            if not self.properties_sent:
-                self.service_management.send_instance_props()
-                self.properties_sent = True
+            with telemetry.report_seconds['heartbeat'].time():
+                if not self.properties_sent:
+                    self.service_management.send_instance_props()
+                    self.properties_sent = True
 
-            self.service_management.send_heart_beat()
+                self.service_management.send_heart_beat()
 
         except grpc.RpcError:
             self.on_error()
@@ -85,10 +92,14 @@ class GrpcProtocol(Protocol):
 
     def on_error(self):
         traceback.print_exc() if logger.isEnabledFor(logging.DEBUG) else None
+        telemetry.reconnects.inc()
         self.channel.unsubscribe(self._cb)
         self.channel.subscribe(self._cb, try_to_connect=True)
 
     def report(self, queue: Queue, block: bool = True):
+        if config.report_batch_size > 0:
+            return self.report_batch(queue, block)
+
         start = None
 
         def generator():
@@ -112,44 +123,7 @@ class GrpcProtocol(Protocol):
                 if logger_debug_enabled:
                     logger.debug('reporting segment %s', segment)
 
-                s = SegmentObject(
-                    traceId=str(segment.related_traces[0]),
-                    traceSegmentId=str(segment.segment_id),
-                    service=config.service_name,
-                    serviceInstance=config.service_instance,
-                    spans=[SpanObject(
-                        spanId=span.sid,
-                        parentSpanId=span.pid,
-                        startTime=span.start_time,
-                        endTime=span.end_time,
-                        operationName=span.op,
-                        peer=span.peer,
-                        spanType=span.kind.name,
-                        spanLayer=span.layer.name,
-                        componentId=span.component.value,
-                        isError=span.error_occurred,
-                        logs=[Log(
-                            time=int(log.timestamp * 1000),
-                            data=[KeyStringValuePair(key=item.key, value=item.val) for item in log.items],
-                        ) for log in span.logs],
-                        tags=[KeyStringValuePair(
-                            key=tag.key,
-                            value=str(tag.val),
-                        ) for tag in span.iter_tags()],
-                        refs=[SegmentReference(
-                            refType=0 if ref.ref_type == 'CrossProcess' else 1,
-                            traceId=ref.trace_id,
-                            parentTraceSegmentId=ref.segment_id,
-                            parentSpanId=ref.span_id,
-                            parentService=ref.service,
-                            parentServiceInstance=ref.service_instance,
-                            parentEndpoint=ref.endpoint,
-                            networkAddressUsedAtPeer=ref.client_address,
-                        ) for ref in span.refs if ref.trace_id],
-                    ) for span in segment.spans],
-                )
-
-                yield s
+                yield segment.transform()
 
         try:
             self.traces_reporter.report(generator())
@@ -157,6 +131,27 @@ class GrpcProtocol(Protocol):
             self.on_error()
             raise  # reraise so that incremental reconnect wait can process
 
+    def report_batch(self, queue: Queue, block: bool = True):
+        start = time()
+
+        # the next batch is only drained once the previous one was acknowledged, so a slow backend
+        # leaves segments in the queue instead of piling up encoded messages in memory
+        while not block or time() - start < config.QUEUE_TIMEOUT:
+            segments = drain(queue, config.report_batch_size, config.report_batch_linger / 1000, block)
+            if not segments:
+                return
+
+            if logger_debug_enabled:
+                logger.debug('reporting %d segments', len(segments))
+
+            try:
+                segments = [segment.transform() for segment in segments]
+                with telemetry.report_seconds['segment'].time():
+                    self.traces_reporter.report_batch(segments)
+            except grpc.RpcError:
+                self.on_error()
+                raise
+
     def report_log(self, queue: Queue, block: bool = True):
         start = None
 
@@ -210,15 +205,7 @@ class GrpcProtocol(Protocol):
 
                 queue.task_done()
 
-                transform_snapshot = ThreadSnapshot(
-                    taskId=str(snapshot.task_id),
-                    traceSegmentId=str(snapshot.trace_segment_id),
-                    time=int(snapshot.time),
-                    sequence=int(snapshot.sequence),
-                    stack=ThreadStack(codeSignatures=snapshot.stack_list)
-                )
-
-                yield transform_snapshot
+                yield snapshot.transform()
 
         try:
             self.profile_channel.send(generator())
@@ -0,0 +1,148 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import logging
+import traceback
+from queue import Queue
+
+import grpc
+
+from skywalking import config, telemetry
+from skywalking.agent.protocol import ProtocolAsync, drain
+from skywalking.client.grpc_aio import GrpcServiceManagementClientAsync, GrpcTraceSegmentReportServiceAsync, \
+    GrpcProfileTaskChannelServiceAsync, GrpcLogDataReportServiceAsync
+from skywalking.loggings import logger, logger_debug_enabled
+from skywalking.profile.profile_task import ProfileTask
+
+# seconds an idle reporter waits at the least before polling its queue again, a zero linger would spin the loop
+_MIN_IDLE_POLL = 0.01
+
+
+class GrpcProtocolAsync(ProtocolAsync):
+    """
+    must be created on the event loop it is used from, grpc.aio channels are bound to the loop that created them
+    """
+
+    def __init__(self):
+        self.properties_sent = False
+
+        if config.force_tls:
+            self.channel = grpc.aio.secure_channel(config.collector_address, grpc.ssl_channel_credentials())
+        else:
+            self.channel = grpc.aio.insecure_channel(config.collector_address)
+
+        metadata = (('authentication', config.authentication),) if config.authentication else None
+
+        self.service_management = GrpcServiceManagementClientAsync(self.channel, metadata)
+        self.traces_reporter = GrpcTraceSegmentReportServiceAsync(self.channel, metadata)
+        self.profile_channel = GrpcProfileTaskChannelServiceAsync(self.channel, metadata)
+        self.log_reporter = GrpcLogDataReportServiceAsync(self.channel, metadata)
+
+    async def query_profile_commands(self):
+        if logger_debug_enabled:
+            logger.debug('query profile commands')
+        await self.profile_channel.do_query()
+
+    async def notify_profile_task_finish(self, task: ProfileTask):
+        await self.profile_channel.finish(task)
+
+    async def heartbeat(self):
+        try:
+            with telemetry.report_seconds['heartbeat'].time():
+                if not self.properties_sent:
+                    await self.service_management.send_instance_props()
+                    self.properties_sent = True
+
+                await self.service_management.send_heart_beat()
+
+        except grpc.RpcError:
+            self.on_error()
+            raise
+
+    def on_error(self):
+        # aio channels reconnect on their own with the next call, there is no connectivity subscription to renew
+        traceback.print_exc() if logger.isEnabledFor(logging.DEBUG) else None
+        telemetry.reconnects.inc()
+
+    async def _drain(self, queue: Queue, block: bool):
+        """
+        take what is already in the queue without waiting on it, which would stall every other task of the loop
+        :return: the taken items, empty after lingering for the next poll when block is set
+        """
+        items = drain(queue, config.report_batch_size or config.max_buffer_size, 0, block=False)
+        if not items and block:
+            await asyncio.sleep(max(config.report_batch_linger / 1000, _MIN_IDLE_POLL))
+        return items
+
+    async def report(self, queue: Queue, block: bool = True):
+        while True:
+            segments = await self._drain(queue, block)
+            if not segments:
+                return
+
+            if logger_debug_enabled:
+                logger.debug('reporting %d segments', len(segments))
+
+            try:
+                segments = [segment.transform() for segment in segments]
+                with telemetry.report_seconds['segment'].time():
+                    if config.report_batch_size > 0:
+                        await self.traces_reporter.report_batch(segments)
+                    else:
+                        await self.traces_reporter.report(iter(segments))
+            except grpc.RpcError:
+                self.on_error()
+                raise
+
+            if block:  # give the other reporters a turn, the next poll picks up what came in meanwhile
+                return
+
+    async def report_log(self, queue: Queue, block: bool = True):
+        while True:
+            logs = await self._drain(queue, block)
+            if not logs:
+                return
+
+            if logger_debug_enabled:
+                logger.debug('reporting %d logs', len(logs))
+
+            try:
+                with telemetry.report_seconds['log'].time():
+                    await self.log_reporter.report(iter(logs))
+            except grpc.RpcError:
+                self.on_error()
+                raise
+
+            if block:
+                return
+
+    async def send_snapshot(self, queue: Queue, block: bool = True):
+        while True:
+            snapshots = await self._drain(queue, block)
+            if not snapshots:
+                return
+
+            try:
+                with telemetry.report_seconds['snapshot'].time():
+                    await self.profile_channel.send(snapshot.transform() for snapshot in snapshots)
+            except grpc.RpcError:
+                self.on_error()
+                raise
+
+            if block:
+                return
@@ -18,8 +18,9 @@
 from queue import Queue, Empty
 from time import time
 
-from skywalking import config
+from skywalking import config, telemetry
 from skywalking.agent import Protocol
+from skywalking.agent.protocol import drain
 from skywalking.client.http import HttpServiceManagementClient, HttpTraceSegmentReportService, HttpLogDataReportService
 from skywalking.loggings import logger, logger_debug_enabled
 from skywalking.protocol.logging.Logging_pb2 import LogData
@@ -36,14 +37,19 @@ class HttpProtocol(Protocol):
     def fork_after_in_child(self):
         self.service_management.fork_after_in_child()
         self.traces_reporter.fork_after_in_child()
+        self.log_reporter.fork_after_in_child()
 
     def heartbeat(self):
-        if not self.properties_sent:
-            self.service_management.send_instance_props()
-            self.properties_sent = True
-        self.service_management.send_heart_beat()
+        with telemetry.report_seconds['heartbeat'].time():
+            if not self.properties_sent:
+                self.service_management.send_instance_props()
+                self.properties_sent = True
+            self.service_management.send_heart_beat()
 
     def report(self, queue: Queue, block: bool = True):
+        if config.report_batch_size > 0:
+            return self.report_batch(queue, block)
+
         start = None
 
         def generator():
@@ -74,6 +80,22 @@ class HttpProtocol(Protocol):
         except Exception:
             pass
 
+    def report_batch(self, queue: Queue, block: bool = True):
+        start = time()
+
+        while not block or time() - start < config.QUEUE_TIMEOUT:
+            segments = drain(queue, config.report_batch_size, config.report_batch_linger / 1000, block)
+            if not segments:
+                return
+
+            if logger_debug_enabled:
+                logger.debug('reporting %d segments', len(segments))
+
+            try:
+                self.traces_reporter.report_batch(segments)
+            except Exception:
+                pass
+
     def report_log(self, queue: Queue, block: bool = True):
         start = None
 
@@ -24,8 +24,6 @@ from skywalking.agent import Protocol
 from skywalking.client.kafka import KafkaServiceManagementClient, KafkaTraceSegmentReportService, \
     KafkaLogDataReportService
 from skywalking.loggings import logger, getLogger, logger_debug_enabled
-from skywalking.protocol.common.Common_pb2 import KeyStringValuePair
-from skywalking.protocol.language_agent.Tracing_pb2 import SegmentObject, SpanObject, Log, SegmentReference
 from skywalking.protocol.logging.Logging_pb2 import LogData
 from skywalking.trace.segment import Segment
 
@@ -40,6 +38,12 @@ class KafkaProtocol(Protocol):
         self.traces_reporter = KafkaTraceSegmentReportService()
         self.log_reporter = KafkaLogDataReportService()
 
+    def fork_after_in_child(self):
+        # the sender threads of the producers are not copied into the child
+        self.service_management = KafkaServiceManagementClient()
+        self.traces_reporter = KafkaTraceSegmentReportService()
+        self.log_reporter = KafkaLogDataReportService()
+
     def heartbeat(self):
         self.service_management.send_heart_beat()
 
@@ -66,44 +70,7 @@ class KafkaProtocol(Protocol):
                 if logger_debug_enabled:
                     logger.debug('reporting segment %s', segment)
 
-                s = SegmentObject(
-                    traceId=str(segment.related_traces[0]),
-                    traceSegmentId=str(segment.segment_id),
-                    service=config.service_name,
-                    serviceInstance=config.service_instance,
-                    spans=[SpanObject(
-                        spanId=span.sid,
-                        parentSpanId=span.pid,
-                        startTime=span.start_time,
-                        endTime=span.end_time,
-                        operationName=span.op,
-                        peer=span.peer,
-                        spanType=span.kind.name,
-                        spanLayer=span.layer.name,
-                        componentId=span.component.value,
-                        isError=span.error_occurred,
-                        logs=[Log(
-                            time=int(log.timestamp * 1000),
-                            data=[KeyStringValuePair(key=item.key, value=item.val) for item in log.items],
-                        ) for log in span.logs],
-                        tags=[KeyStringValuePair(
-                            key=tag.key,
-                            value=str(tag.val),
-                        ) for tag in span.iter_tags()],
-                        refs=[SegmentReference(
-                            refType=0 if ref.ref_type == 'CrossProcess' else 1,
-                            traceId=ref.trace_id,
-                            parentTraceSegmentId=ref.segment_id,
-                            parentSpanId=ref.span_id,
-                            parentService=ref.service,
-                            parentServiceInstance=ref.service_instance,
-                            parentEndpoint=ref.endpoint,
-                            networkAddressUsedAtPeer=ref.client_address,
-                        ) for ref in span.refs if ref.trace_id],
-                    ) for span in segment.spans],
-                )
-
-                yield s
+                yield segment.transform()
 
         self.traces_reporter.report(generator())
 
@@ -28,6 +28,9 @@ class TraceSegmentReportService(object):
     def report(self, generator):
         raise NotImplementedError()
 
+    def report_batch(self, segments):
+        raise NotImplementedError()
+
 
 class LogDataReportService(object):
     def report(self, generator):
@@ -40,3 +43,32 @@ class ProfileTaskChannelService(object):
 
     def send(self, generator):
         raise NotImplementedError()
+
+
+class ServiceManagementClientAsync(object):
+    async def send_instance_props(self):
+        raise NotImplementedError()
+
+    async def send_heart_beat(self):
+        raise NotImplementedError()
+
+
+class TraceSegmentReportServiceAsync(object):
+    async def report(self, generator):
+        raise NotImplementedError()
+
+    async def report_batch(self, segments):
+        raise NotImplementedError()
+
+
+class LogDataReportServiceAsync(object):
+    async def report(self, generator):
+        raise NotImplementedError()
+
+
+class ProfileTaskChannelServiceAsync(object):
+    async def do_query(self):
+        raise NotImplementedError()
+
+    async def send(self, generator):
+        raise NotImplementedError()
@@ -26,6 +26,7 @@ from skywalking.loggings import logger, logger_debug_enabled
 from skywalking.profile import profile_task_execution_service
 from skywalking.profile.profile_task import ProfileTask
 from skywalking.protocol.common.Common_pb2 import KeyStringValuePair
+from skywalking.protocol.language_agent.Tracing_pb2 import SegmentCollection
 from skywalking.protocol.language_agent.Tracing_pb2_grpc import TraceSegmentReportServiceStub
 from skywalking.protocol.logging.Logging_pb2_grpc import LogReportServiceStub
 from skywalking.protocol.management.Management_pb2 import InstancePingPkg, InstanceProperties
@@ -72,6 +73,10 @@ class GrpcTraceSegmentReportService(TraceSegmentReportService):
     def report(self, generator):
         self.report_stub.collect(generator)
 
+    def report_batch(self, segments):
+        # one unary call carries the whole batch, instead of a stream frame per segment
+        self.report_stub.collectInSync(SegmentCollection(segments=segments))
+
 
 class GrpcLogDataReportService(LogDataReportService):
     def __init__(self, channel: grpc.Channel):
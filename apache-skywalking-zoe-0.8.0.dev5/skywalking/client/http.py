@@ -14,15 +14,37 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import gzip
 import json
 import os
 
 import requests
 from google.protobuf import json_format
 
-from skywalking import config
+from skywalking import config, telemetry
 from skywalking.client import ServiceManagementClient, TraceSegmentReportService, LogDataReportService
 from skywalking.loggings import logger, logger_debug_enabled
+from skywalking.trace.segment import SpilledSegment
+
+
+def new_session() -> requests.Session:
+    """
+    a keep-alive session, every reporter posts from a single thread one request at a time so the one connection its
+    default pool keeps to the collector is all it needs
+    """
+    return requests.Session()
+
+
+def post_json(session: requests.Session, url: str, payload) -> requests.Response:
+    """
+    post the payload as compact json, gzipped when config.http_compress is set
+    """
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+    if config.http_compress:
+        body = gzip.compress(body, compresslevel=config.http_compress_level)
+        headers['Content-Encoding'] = 'gzip'
+    return session.post(url, data=body, headers=headers)
 
 
 class HttpServiceManagementClient(ServiceManagementClient):
@@ -30,11 +52,11 @@ class HttpServiceManagementClient(ServiceManagementClient):
         proto = 'https://' if config.force_tls else 'http://'
         self.url_instance_props = f"{proto}{config.collector_address.rstrip('/')}/v3/management/reportProperties"
         self.url_heart_beat = f"{proto}{config.collector_address.rstrip('/')}/v3/management/keepAlive"
-        self.session = requests.Session()
+        self.session = new_session()
 
     def fork_after_in_child(self):
         self.session.close()
-        self.session = requests.Session()
+        self.session = new_session()
 
     def send_instance_props(self):
         properties = [
@@ -70,70 +92,122 @@ class HttpTraceSegmentReportService(TraceSegmentReportService):
     def __init__(self):
         proto = 'https://' if config.force_tls else 'http://'
         self.url_report = f"{proto}{config.collector_address.rstrip('/')}/v3/segment"
-        self.session = requests.Session()
+        self.url_report_batch = f"{proto}{config.collector_address.rstrip('/')}/v3/segments"
+        self.session = new_session()
 
     def fork_after_in_child(self):
         self.session.close()
-        self.session = requests.Session()
+        self.session = new_session()
 
     def report(self, generator):
         for segment in generator:
-            res = self.session.post(self.url_report, json={
-                'traceId': str(segment.related_traces[0]),
-                'traceSegmentId': str(segment.segment_id),
-                'service': config.service_name,
-                'serviceInstance': config.service_instance,
-                'spans': [{
-                    'spanId': span.sid,
-                    'parentSpanId': span.pid,
-                    'startTime': span.start_time,
-                    'endTime': span.end_time,
-                    'operationName': span.op,
-                    'peer': span.peer,
-                    'spanType': span.kind.name,
-                    'spanLayer': span.layer.name,
-                    'componentId': span.component.value,
-                    'isError': span.error_occurred,
-                    'logs': [{
-                        'time': int(log.timestamp * 1000),
-                        'data': [{
-                            'key': item.key,
-                            'value': item.val,
-                        } for item in log.items],
-                    } for log in span.logs],
-                    'tags': [{
-                        'key': tag.key,
-                        'value': tag.val,
-                    } for tag in span.iter_tags()],
-                    'refs': [{
-                        'refType': 0,
-                        'traceId': ref.trace_id,
-                        'parentTraceSegmentId': ref.segment_id,
-                        'parentSpanId': ref.span_id,
-                        'parentService': ref.service,
-                        'parentServiceInstance': ref.service_instance,
-                        'parentEndpoint': ref.endpoint,
-                        'networkAddressUsedAtPeer': ref.client_address,
-                    } for ref in span.refs if ref.trace_id]
-                } for span in segment.spans]
-            })
+            segment = self._transform(segment)
+            with telemetry.report_seconds['segment'].time():
+                res = post_json(self.session, self.url_report, segment)
             if logger_debug_enabled:
                 logger.debug('report traces response: %s', res)
 
+    def report_batch(self, segments):
+        segments = [self._transform(segment) for segment in segments]
+        with telemetry.report_seconds['segment'].time():
+            res = post_json(self.session, self.url_report_batch, segments)
+        if logger_debug_enabled:
+            logger.debug('report batch traces response: %s', res)
+
+    @staticmethod
+    def _transform(segment) -> dict:
+        if isinstance(segment, SpilledSegment):
+            return json_format.MessageToDict(segment.transform())
+
+        with telemetry.encode_seconds.time():
+            transformed = HttpTraceSegmentReportService._transform_segment(segment)
+        telemetry.segments_encoded.inc()
+        telemetry.spans_encoded.inc(len(segment.spans))
+        return transformed
+
+    @staticmethod
+    def _transform_segment(segment) -> dict:
+        return {
+            'traceId': str(segment.related_traces[0]),
+            'traceSegmentId': str(segment.segment_id),
+            'service': config.service_name,
+            'serviceInstance': config.service_instance,
+            'spans': [{
+                'spanId': span.sid,
+                'parentSpanId': span.pid,
+                'startTime': span.start_time,
+                'endTime': span.end_time,
+                'operationName': span.op,
+                'peer': span.peer,
+                'spanType': span.kind.name,
+                'spanLayer': span.layer.name,
+                'componentId': span.component.value,
+                'isError': span.error_occurred,
+                'logs': [{
+                    'time': int(log.timestamp * 1000),
+                    'data': [{
+                        'key': item.key,
+                        'value': item.val,
+                    } for item in log.items],
+                } for log in span.logs],
+                'tags': [{
+                    'key': tag.key,
+                    'value': tag.val,
+                } for tag in span.iter_tags()],
+                'refs': [{
+                    'refType': 0,
+                    'traceId': ref.trace_id,
+                    'parentTraceSegmentId': ref.segment_id,
+                    'parentSpanId': ref.span_id,
+                    'parentService': ref.service,
+                    'parentServiceInstance': ref.service_instance,
+                    'parentEndpoint': ref.endpoint,
+                    'networkAddressUsedAtPeer': ref.client_address,
+                } for ref in span.refs if ref.trace_id]
+            } for span in segment.spans]
+        }
+
 
 class HttpLogDataReportService(LogDataReportService):
     def __init__(self):
         proto = 'https://' if config.force_tls else 'http://'
         self.url_report = f"{proto}{config.collector_address.rstrip('/')}/v3/logs"
-        self.session = requests.Session()
+        self.session = new_session()
 
     def fork_after_in_child(self):
         self.session.close()
-        self.session = requests.Session()
+        self.session = new_session()
 
     def report(self, generator):
-        log_batch = [json.loads(json_format.MessageToJson(log_data)) for log_data in generator]
+        log_batch = [self._transform(log_data) for log_data in generator]
         if log_batch:  # prevent empty batches
-            res = self.session.post(self.url_report, json=log_batch)
+            with telemetry.report_seconds['log'].time():
+                res = post_json(self.session, self.url_report, log_batch)
             if logger_debug_enabled:
                 logger.debug('report batch log response: %s', res)
+
+    @staticmethod
+    def _transform(log_data) -> dict:
+        """
+        read the fields straight off the LogData message, the collector accepts the same json MessageToJson produces
+        """
+        body = log_data.body
+        content = body.WhichOneof('content')  # text, json or yaml, each holding a single field of the same name
+        log = {
+            'timestamp': log_data.timestamp,
+            'service': log_data.service,
+            'serviceInstance': log_data.serviceInstance,
+            'body': {'type': body.type, content: {content: getattr(getattr(body, content), content)}}
+            if content else {'type': body.type},
+            'tags': {'data': [{'key': tag.key, 'value': tag.value} for tag in log_data.tags.data]},
+        }
+        if log_data.endpoint:
+            log['endpoint'] = log_data.endpoint
+        if log_data.HasField('traceContext'):
+            trace_context = log_data.traceContext
+            log['traceContext'] = {
+                'traceId': trace_context.traceId,
+                'traceSegmentId': trace_context.traceSegmentId,
+                'spanId': trace_context.spanId,
+            }
+        return log
@@ -17,14 +17,16 @@
 
 import ast
 import os
+from time import perf_counter
 
 from kafka import KafkaProducer
 
-from skywalking import config
+from skywalking import config, telemetry
 from skywalking.client import ServiceManagementClient, TraceSegmentReportService, LogDataReportService
 from skywalking.loggings import logger, logger_debug_enabled
 from skywalking.protocol.common.Common_pb2 import KeyStringValuePair
 from skywalking.protocol.management.Management_pb2 import InstancePingPkg, InstanceProperties
+from skywalking.utils.integer import AtomicInteger
 
 kafka_configs = {}
 
@@ -51,10 +53,53 @@ def __init_kafka_configs():
         else:
             raise KafkaConfigDuplicated(key)
 
+    # let the producer batch up records for as long as the agent batches segments, unless configured explicitly
+    if config.report_batch_size > 0:
+        kafka_configs.setdefault('linger_ms', config.report_batch_linger)
+
 
 __init_kafka_configs()
 
 
+class DeliveryMetrics:
+    """
+    counts the records acknowledged or rejected by the brokers, updated from the delivery callbacks of the producers
+    """
+
+    def __init__(self):
+        self.acked = AtomicInteger(var=0)
+        self.failed = AtomicInteger(var=0)
+        self.in_flight_bytes = AtomicInteger(var=0)
+
+    def send(self, producer: KafkaProducer, topic: str, key: bytes, value: bytes, reporter: str):
+        """
+        send the record without waiting for it to be delivered
+        :param reporter: the label of the delivery latency in telemetry.report_seconds
+        :return: the future of the record, already carrying the callbacks that keep the counters up to date
+        """
+        size = len(value)
+        start = perf_counter()
+        future = producer.send(topic=topic, key=key, value=value)  # raises without a callback when the buffer is full
+        self.in_flight_bytes.add_and_get(size)
+        future.add_callback(self._on_acked, size, reporter, start)
+        future.add_errback(self._on_failed, size)
+        return future
+
+    def _on_acked(self, size, reporter, start, _):
+        telemetry.report_seconds[reporter].observe(perf_counter() - start)
+        self.acked.add_and_get(1)
+        self.in_flight_bytes.add_and_get(-size)
+
+    def _on_failed(self, size, exc):
+        self.failed.add_and_get(1)
+        self.in_flight_bytes.add_and_get(-size)
+        if logger_debug_enabled:
+            logger.debug('failed to deliver kafka record: %s', exc)
+
+
+delivery_metrics = DeliveryMetrics()
+
+
 class KafkaServiceManagementClient(ServiceManagementClient):
     def __init__(self):
         if logger_debug_enabled:
@@ -80,7 +125,7 @@ class KafkaServiceManagementClient(ServiceManagementClient):
 
         key = bytes(self.topic_key_register + instance.serviceInstance, encoding='utf-8')
         value = bytes(instance.SerializeToString())
-        self.producer.send(topic=self.topic, key=key, value=value)
+        delivery_metrics.send(self.producer, self.topic, key, value, 'heartbeat')
 
     def send_heart_beat(self):
         if logger_debug_enabled:
@@ -97,7 +142,9 @@ class KafkaServiceManagementClient(ServiceManagementClient):
 
         key = bytes(instance_ping_pkg.serviceInstance, encoding='utf-8')
         value = bytes(instance_ping_pkg.SerializeToString())
-        future = self.producer.send(topic=self.topic, key=key, value=value)
+        # the heartbeat runs on the blocking worker of the scheduler, waiting for the ack only holds up the other
+        # calls to the backend, and a broker that is down raises here and marks the backend unavailable
+        future = delivery_metrics.send(self.producer, self.topic, key, value, 'heartbeat')
         res = future.get(timeout=10)
         if logger_debug_enabled:
             logger.debug('heartbeat response: %s', res)
@@ -112,7 +159,7 @@ class KafkaTraceSegmentReportService(TraceSegmentReportService):
         for segment in generator:
             key = bytes(segment.traceSegmentId, encoding='utf-8')
             value = bytes(segment.SerializeToString())
-            self.producer.send(topic=self.topic, key=key, value=value)
+            delivery_metrics.send(self.producer, self.topic, key, value, 'segment')
 
 
 class KafkaLogDataReportService(LogDataReportService):
@@ -124,7 +171,7 @@ class KafkaLogDataReportService(LogDataReportService):
         for log_data in generator:
             key = bytes(log_data.traceContext.traceSegmentId, encoding='utf-8')
             value = bytes(log_data.SerializeToString())
-            self.producer.send(topic=self.topic, key=key, value=value)
+            delivery_metrics.send(self.producer, self.topic, key, value, 'log')
 
 
 class KafkaConfigDuplicated(Exception):
@@ -21,17 +21,21 @@ import uuid
 # Change to future after Python3.6 support ends
 from typing import List, Pattern
 
+from skywalking.utils.path_matcher import PathMatcher
+
 QUEUE_TIMEOUT: int = 1
 
-RE_IGNORE_PATH: Pattern = re.compile('^$')
-RE_HTTP_IGNORE_METHOD: Pattern = RE_IGNORE_PATH
+IGNORE_PATH: PathMatcher = PathMatcher('', '')
+# deprecated, use IGNORE_PATH, whose match(op) is truthy for the ignored ops just like the regex this used to be
+RE_IGNORE_PATH: PathMatcher = IGNORE_PATH
+RE_HTTP_IGNORE_METHOD: Pattern = re.compile('^$')
 
 options = None  # here to include 'options' in globals
 options = globals().copy()  # THIS MUST PRECEDE DIRECTLY BEFORE LIST OF CONFIG OPTIONS!
 
 # Core level configurations
 service_name: str = os.getenv('SW_AGENT_NAME') or 'Python Service Name'
-service_instance: str = os.getenv('SW_AGENT_INSTANCE') or str(uuid.uuid1()).replace('-', '')
+service_instance: str = os.getenv('SW_AGENT_INSTANCE') or uuid.uuid1().hex
 agent_namespace: str = os.getenv('SW_AGENT_NAMESPACE')
 collector_address: str = os.getenv('SW_AGENT_COLLECTOR_BACKEND_SERVICES') or '127.0.0.1:11800'
 kafka_bootstrap_servers: str = os.getenv('SW_KAFKA_REPORTER_BOOTSTRAP_SERVERS') or 'localhost:9092'
@@ -44,12 +48,73 @@ authentication: str = os.getenv('SW_AGENT_AUTHENTICATION')
 logging_level: str = os.getenv('SW_AGENT_LOGGING_LEVEL') or 'INFO'
 disable_plugins: List[str] = (os.getenv('SW_AGENT_DISABLE_PLUGINS') or '').split(',')
 max_buffer_size: int = int(os.getenv('SW_AGENT_MAX_BUFFER_SIZE', '10000'))
+# report up to this many segments per request, 0 keeps streaming segments one by one
+report_batch_size: int = int(os.getenv('SW_AGENT_REPORT_BATCH_SIZE') or '0')
+# milliseconds to wait for a batch to fill up once its first segment is taken
+report_batch_linger: int = int(os.getenv('SW_AGENT_REPORT_BATCH_LINGER') or '100')
+# gzip the bodies posted by the http protocol
+http_compress: bool = os.getenv('SW_AGENT_HTTP_COMPRESS', '').lower() == 'true'
+http_compress_level: int = int(os.getenv('SW_AGENT_HTTP_COMPRESS_LEVEL') or '6')
+# run all reporters as tasks of one asyncio event loop thread instead of a thread each, grpc protocol only
+asyncio_reporter: bool = os.getenv('SW_AGENT_ASYNCIO_REPORTER', '').lower() == 'true'
+# directory the segments and logs overflowing the queues are spilled to, empty to drop them instead
+spill_dir: str = os.getenv('SW_AGENT_SPILL_DIR') or ''
+# megabytes of spill files kept for each of segments and logs, further records are dropped
+spill_max_size: int = int(os.getenv('SW_AGENT_SPILL_MAX_SIZE') or '128')
+# megabytes per spill file
+spill_file_size: int = int(os.getenv('SW_AGENT_SPILL_FILE_SIZE') or '8')
+# records per second moved back from the spill files into the queues once the backend is reachable again
+spill_replay_rate: int = int(os.getenv('SW_AGENT_SPILL_REPLAY_RATE') or '1000')
+# port to serve the agent's own metrics on as prometheus text at /metrics, 0 to only keep them in-process
+telemetry_port: int = int(os.getenv('SW_AGENT_TELEMETRY_PORT') or '0')
+# local only by default, set to 0.0.0.0 to let a scraper on another host in
+telemetry_host: str = os.getenv('SW_AGENT_TELEMETRY_HOST') or '127.0.0.1'
+# ports after telemetry_port tried in turn by forked processes, e.g. prefork server workers, each serves its own metrics
+telemetry_child_ports: int = int(os.getenv('SW_AGENT_TELEMETRY_CHILD_PORTS') or '64')
+# seconds between the warnings summing up the items dropped from the full queues
+drop_warning_interval: float = float(os.getenv('SW_AGENT_DROP_WARNING_INTERVAL') or '10')
+# seconds fork() waits for the reporters to finish their current call to the backend before copying the process
+fork_quiesce_timeout: float = float(os.getenv('SW_AGENT_FORK_QUIESCE_TIMEOUT') or '5')
+# kill switch for tracing, when off new requests get the shared noop span while traces already started still finish,
+# it can be flipped at runtime through config.init(tracing_enabled=False)
+tracing_enabled: bool = os.getenv('SW_AGENT_TRACING_ENABLED', 'true').lower() == 'true'
+# matched against the ops of entry spans only, exit and local spans are never ignored by their op
 trace_ignore_path: str = os.getenv('SW_TRACE_IGNORE_PATH') or ''
+# entry span ops whose ignore decision is remembered, 0 to match every time
+trace_ignore_path_cache_size: int = int(os.getenv('SW_TRACE_IGNORE_PATH_CACHE_SIZE') or '1024')
 ignore_suffix: str = os.getenv('SW_IGNORE_SUFFIX') or '.jpg,.jpeg,.js,.css,.png,.bmp,.gif,.ico,.mp3,' \
                                                       '.mp4,.html,.svg '
 correlation_element_max_number: int = int(os.getenv('SW_CORRELATION_ELEMENT_MAX_NUMBER') or '3')
 correlation_value_max_length: int = int(os.getenv('SW_CORRELATION_VALUE_MAX_LENGTH') or '128')
 
+# sampling configurations
+# fraction of new traces to sample, traces continued from an upstream service always follow its decision
+sample_rate: float = float(os.getenv('SW_AGENT_SAMPLE_RATE') or '1')
+# per endpoint limits of sampled traces per second, e.g. `/users=10,/orders=5`, `*` applies to all other endpoints
+sample_endpoint_limits: str = os.getenv('SW_AGENT_SAMPLE_ENDPOINT_LIMITS') or ''
+# percentage of a cpu core the report thread may use before the sampling rate is lowered, 0 disables it
+sample_cpu_budget: float = float(os.getenv('SW_AGENT_SAMPLE_CPU_BUDGET') or '0')
+# only report traces that are slow, errored or tagged as configured, plus a baseline share of the others
+tail_sample_active: bool = os.getenv('SW_AGENT_TAIL_SAMPLE_ACTIVE') == 'True'
+tail_sample_latency_threshold: int = int(os.getenv('SW_AGENT_TAIL_SAMPLE_LATENCY_THRESHOLD') or '500')
+# tags that make a trace worth keeping, e.g. `http.status_code=500,db.statement`, a key alone matches any value
+tail_sample_tags: str = os.getenv('SW_AGENT_TAIL_SAMPLE_TAGS') or ''
+tail_sample_baseline_rate: float = float(os.getenv('SW_AGENT_TAIL_SAMPLE_BASELINE_RATE') or '0.01')
+# milliseconds a segment is held waiting for another segment of its trace to be found interesting
+tail_sample_hold_time: int = int(os.getenv('SW_AGENT_TAIL_SAMPLE_HOLD_TIME') or '1000')
+tail_sample_buffer_size: int = int(os.getenv('SW_AGENT_TAIL_SAMPLE_BUFFER_SIZE') or '1000')
+# endpoint naming of entry spans
+# route templates naming the endpoints, e.g. `/users/{id},/users/{id}/orders`, a `{...}` segment matches any segment
+endpoint_templates: str = os.getenv('SW_AGENT_ENDPOINT_TEMPLATES') or ''
+# `<regex>=<name>` rules separated by `;` for the ops no template matches, the name may refer to groups as \1
+endpoint_rules: str = os.getenv('SW_AGENT_ENDPOINT_RULES') or ''
+# replace the numeric, uuid and long hex segments of url paths with {id} when nothing else matched
+endpoint_group_ids: bool = os.getenv('SW_AGENT_ENDPOINT_GROUP_IDS', 'true').lower() == 'true'
+# distinct endpoint names this process reports at most, the later ones are all named /{other}, 0 for no limit
+endpoint_max_count: int = int(os.getenv('SW_AGENT_ENDPOINT_MAX_COUNT') or '1000')
+# raw ops whose endpoint name is remembered, 0 to group every time
+endpoint_cache_size: int = int(os.getenv('SW_AGENT_ENDPOINT_CACHE_SIZE') or '1024')
+
 # Plugin configurations
 sql_parameters_length: int = int(os.getenv('SW_SQL_PARAMETERS_LENGTH') or '0')
 pymongo_trace_parameters: bool = os.getenv('SW_PYMONGO_TRACE_PARAMETERS') == 'True'
@@ -73,6 +138,22 @@ profile_max_parallel: int = int(os.getenv('SW_AGENT_PROFILE_MAX_PARALLEL') or '5
 profile_duration: int = int(os.getenv('SW_AGENT_PROFILE_DURATION') or '10')
 profile_dump_max_stack_depth: int = int(os.getenv('SW_AGENT_PROFILE_DUMP_MAX_STACK_DEPTH') or '500')
 profile_snapshot_transport_buffer_size: int = int(os.getenv('SW_AGENT_PROFILE_SNAPSHOT_TRANSPORT_BUFFER_SIZE') or '50')
+# send only the first and the last of consecutive dumps of an unchanged stack, their sequence numbers stay contiguous,
+# off by default as the backend then counts fewer dumps for the time spent in an unchanged stack
+profile_snapshot_coalesce: bool = os.getenv('SW_AGENT_PROFILE_SNAPSHOT_COALESCE', '').lower() == 'true'
+# always-on sampling of every thread, independent of the profile tasks, written locally as collapsed stack files
+continuous_profile_active: bool = os.getenv('SW_AGENT_CONTINUOUS_PROFILE_ACTIVE', '').lower() == 'true'
+continuous_profile_hz: float = float(os.getenv('SW_AGENT_CONTINUOUS_PROFILE_HZ') or '19')
+# directory of the collapsed stack files, a skywalking-profiles directory in the system temp directory by default
+continuous_profile_dir: str = os.getenv('SW_AGENT_CONTINUOUS_PROFILE_DIR') or ''
+# minutes covered by each file
+continuous_profile_rotate_interval: float = float(os.getenv('SW_AGENT_CONTINUOUS_PROFILE_ROTATE_INTERVAL') or '10')
+# distinct frames kept per file, deeper frames of new stacks are cut off once reached
+continuous_profile_max_nodes: int = int(os.getenv('SW_AGENT_CONTINUOUS_PROFILE_MAX_NODES') or '50000')
+# percentage of a cpu core sampling may use, the sampling rate is lowered beyond it
+continuous_profile_cpu_budget: float = float(os.getenv('SW_AGENT_CONTINUOUS_PROFILE_CPU_BUDGET') or '1')
+# files kept per service in the directory, the oldest are removed beyond it, a day at the default interval, 0 keeps all
+continuous_profile_max_files: int = int(os.getenv('SW_AGENT_CONTINUOUS_PROFILE_MAX_FILES') or '144')
 
 # log reporter configurations
 log_reporter_active: bool = os.getenv('SW_AGENT_LOG_REPORTER_ACTIVE') == 'True'
@@ -100,24 +181,10 @@ def init(**kwargs):
 
 
 def finalize():
-    reesc = re.compile(r'([.*+?^=!:${}()|\[\]\\])')
-    suffix = r'^.+(?:' + '|'.join(reesc.sub(r'\\\1', s.strip()) for s in ignore_suffix.split(',')) + ')$'
     method = r'^' + '|'.join(s.strip() for s in http_ignore_method.split(',')) + '$'
-    path = '^(?:' + \
-           '|'.join(  # replaces ","
-               '/(?:[^/]*/)*'.join(  # replaces "/**/"
-                   '(?:(?:[^/]+/)*[^/]+)?'.join(  # replaces "**"
-                       '[^/]*'.join(  # replaces "*"
-                           '[^/]'.join(  # replaces "?"
-                               reesc.sub(r'\\\1', s) for s in p3.split('?')
-                           ) for p3 in p2.split('*')
-                       ) for p2 in p1.strip().split('**')
-                   ) for p1 in p0.split('/**/')
-               ) for p0 in trace_ignore_path.split(',')
-           ) + ')$'
-
-    global RE_IGNORE_PATH, RE_HTTP_IGNORE_METHOD
-    RE_IGNORE_PATH = re.compile(f'{suffix}|{path}')
+
+    global IGNORE_PATH, RE_IGNORE_PATH, RE_HTTP_IGNORE_METHOD
+    IGNORE_PATH = RE_IGNORE_PATH = PathMatcher(trace_ignore_path, ignore_suffix, trace_ignore_path_cache_size)
     RE_HTTP_IGNORE_METHOD = re.compile(method, re.IGNORECASE)
 
 
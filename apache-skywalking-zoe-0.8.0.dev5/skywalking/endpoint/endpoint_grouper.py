@@ -0,0 +1,167 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from skywalking import config
+from skywalking.loggings import logger
+
+# the name of every endpoint beyond SW_AGENT_ENDPOINT_MAX_COUNT
+OVERFLOW_ENDPOINT = '/{other}'
+
+
+class Grouping:
+    """
+    one way of naming the endpoints of entry span ops, `group` returns None when it doesn't apply to the op
+    """
+
+    def group(self, op: str) -> Optional[str]:
+        raise NotImplementedError
+
+
+class TemplateGrouping(Grouping):
+    """
+    route templates like `/users/{id}/orders`, a `{...}` segment matches any single path segment
+    """
+
+    def __init__(self, templates: List[str]):
+        # type: Dict[int, List[Tuple[str, List[Optional[str]]]]]
+        self._templates = {}
+        for template in templates:
+            parts = [None if s.startswith('{') and s.endswith('}') else s for s in template.split('/')]
+            self._templates.setdefault(len(parts), []).append((template, parts))
+
+    def group(self, op: str) -> Optional[str]:
+        segments = op.split('/')
+        for template, parts in self._templates.get(len(segments), ()):
+            if all(part is None or part == segment for part, segment in zip(parts, segments)):
+                return template
+        return None
+
+
+class RegexGrouping(Grouping):
+    """
+    the first regex matching the whole op names it, the name may refer to the groups of the match as \\1 or \\g<name>
+    """
+
+    def __init__(self, rules: List[Tuple[Pattern, str]]):
+        self._rules = rules
+
+    def group(self, op: str) -> Optional[str]:
+        for pattern, name in self._rules:
+            match = pattern.fullmatch(op)
+            if match:
+                return match.expand(name)
+        return None
+
+
+class IdGrouping(Grouping):
+    """
+    replaces the numeric, uuid and long hex segments of url paths with `{id}`
+    """
+
+    RE_ID = re.compile(r'\d+|[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,}')
+
+    def group(self, op: str) -> Optional[str]:
+        if not op.startswith('/'):  # only url paths, other entry ops are queue, task or rpc names
+            return None
+
+        segments = op.split('/')
+        collapsed = False
+        for i, segment in enumerate(segments):
+            if segment and self.RE_ID.fullmatch(segment):
+                segments[i] = '{id}'
+                collapsed = True
+
+        return '/'.join(segments) if collapsed else None
+
+
+class EndpointGrouper:
+    """
+    Names the endpoints of entry spans through a chain of groupings, the first one that applies wins and ops no
+    grouping applies to keep their name.
+
+    At most `max_endpoints` distinct names are handed out per process, later ones all become OVERFLOW_ENDPOINT so
+    that unbounded ids in urls can't blow up the backend. The names of the most recent ops are kept in an lru cache.
+    """
+
+    def __init__(self, groupings: List[Grouping], max_endpoints: int = 0, cache_size: int = 1024):
+        self.groupings = groupings
+        self.max_endpoints = max_endpoints
+        self._endpoints = set()
+        self._warned = False
+        self.group = lru_cache(maxsize=cache_size)(self._group) if cache_size > 0 else self._group
+
+    def add(self, grouping: Grouping):
+        """
+        plug in a custom grouping, it is tried before the configured ones
+        """
+        self.groupings.insert(0, grouping)
+        if hasattr(self.group, 'cache_clear'):
+            self.group.cache_clear()
+
+    def _group(self, op: str) -> str:
+        name = op
+        for grouping in self.groupings:
+            grouped = grouping.group(op)
+            if grouped is not None:
+                name = grouped
+                break
+
+        if self.max_endpoints <= 0 or name in self._endpoints:
+            return name
+
+        # not atomic with the add, concurrent new names may overshoot the limit by a few
+        if len(self._endpoints) >= self.max_endpoints:
+            if not self._warned:
+                self._warned = True
+                logger.warning('more than %d endpoints, new ones are reported as %s, group them with '
+                               'SW_AGENT_ENDPOINT_TEMPLATES or SW_AGENT_ENDPOINT_RULES', self.max_endpoints,
+                               OVERFLOW_ENDPOINT)
+            return OVERFLOW_ENDPOINT
+
+        self._endpoints.add(name)
+        return name
+
+
+def build() -> EndpointGrouper:
+    groupings = []  # type: List[Grouping]
+
+    templates = [t.strip() for t in config.endpoint_templates.split(',') if t.strip()]
+    if templates:
+        groupings.append(TemplateGrouping(templates))
+
+    rules = []
+    for rule in config.endpoint_rules.split(';'):
+        if not rule.strip():
+            continue
+        regex, sep, name = rule.strip().rpartition('=')
+        try:
+            if not sep:
+                raise re.error('missing name')
+            rules.append((re.compile(regex), name))
+        except re.error:
+            logger.warning('invalid endpoint rule [%s], it should be in the format of <regex>=<name>', rule)
+    if rules:
+        groupings.append(RegexGrouping(rules))
+
+    if config.endpoint_group_ids:
+        groupings.append(IdGrouping())
+
+    return EndpointGrouper(groupings, config.endpoint_max_count, config.endpoint_cache_size)
@@ -17,8 +17,7 @@
 
 from skywalking import Layer, Component, config
 from skywalking.trace.carrier import Carrier
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpStatusCode
 
 link_vector = ['https://docs.aiohttp.org']
@@ -44,7 +43,7 @@ def install():
         url = url.with_user(None).with_password(None)
         peer = f"{url.host or ''}:{url.port or ''}"
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_exit_span(op=url.path or '/', peer=peer, component=Component.AioHttp)
 
         with span:
@@ -85,7 +84,7 @@ def install():
             if val is not None:
                 item.val = val
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_entry_span(op=request.path, carrier=carrier)
 
         with span:
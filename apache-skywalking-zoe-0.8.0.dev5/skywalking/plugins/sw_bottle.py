@@ -17,8 +17,7 @@
 
 from skywalking import Layer, Component, config
 from skywalking.trace.carrier import Carrier
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpParams, TagHttpStatusCode, TagHttpURL
 
 link_vector = ['http://bottlepy.org/docs/dev/']
@@ -58,7 +57,7 @@ def install():
             if item.key.capitalize() in request.headers:
                 item.val = request.headers[item.key.capitalize()]
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_entry_span(op=request.path, carrier=carrier, inherit=Component.General)
 
         with span:
@@ -17,8 +17,7 @@
 
 from skywalking import Layer, Component, config
 from skywalking.trace.carrier import Carrier
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpStatusCode, TagHttpParams
 
 link_vector = ['https://www.djangoproject.com/']
@@ -54,7 +53,7 @@ def install():
             if sw_http_header_key in request.META:
                 item.val = request.META[sw_http_header_key]
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_entry_span(op=request.path, carrier=carrier)
 
         with span:
@@ -17,8 +17,7 @@
 
 from skywalking import Layer, Component, config
 from skywalking.trace.carrier import Carrier
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpParams, TagHttpStatusCode, TagHttpStatusMsg
 
 link_vector = ['https://falcon.readthedocs.io/en/stable/']
@@ -48,7 +47,7 @@ def install():
             if key in headers:
                 item.val = headers[key]
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else context.new_entry_span(op=req.path, carrier=carrier)
 
         with span:
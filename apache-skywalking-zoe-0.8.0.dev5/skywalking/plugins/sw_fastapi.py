@@ -17,8 +17,7 @@
 
 from skywalking import Layer, Component, config
 from skywalking.trace.carrier import Carrier
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpStatusCode, TagHttpParams
 
 link_vector = ['https://fastapi.tiangolo.com']
@@ -50,17 +49,20 @@ def install():
             if item.key.capitalize() in req.headers:
                 item.val = req.headers[item.key.capitalize()]
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_entry_span(op=dict(scope)['path'], carrier=carrier, inherit=Component.General)
 
         with span:
-            context = get_context()
-            trace_id = (
-                context.segment.related_traces[0].value
-                if context.segment.related_traces
-                else ''
-            )
-            span_id = context.segment.segment_id.value if context.segment else trace_id
+            if span is noop_span:  # shared by every ignored request, it has no ids of its own
+                trace_id = span_id = ''
+            else:
+                context = get_context()
+                trace_id = (
+                    context.segment.related_traces[0].value
+                    if context.segment.related_traces
+                    else ''
+                )
+                span_id = context.segment.segment_id.value if context.segment else trace_id
             req.state.trace_id = trace_id
             req.state.span_id = span_id
 
@@ -19,8 +19,7 @@ import inspect
 
 from skywalking import Layer, Component, config
 from skywalking.trace.carrier import Carrier
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpStatusCode
 
 link_vector = ['https://docs.python.org/3/library/http.server.html',
@@ -74,7 +73,7 @@ def wrap_werkzeug_request_handler(handler):
             item.val = handler.headers[item.key.capitalize()]
         path = handler.path or '/'
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_entry_span(op=path.split('?')[0], carrier=carrier)
 
         with span:
@@ -126,7 +125,7 @@ def _wrap_do_method(handler, method):
                 item.val = handler.headers[item.key.capitalize()]
             path = handler.path or '/'
 
-            span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+            span = noop_span if config.ignore_http_method_check(method) \
                 else get_context().new_entry_span(op=path.split('?')[0], carrier=carrier)
 
             with span:
@@ -16,8 +16,7 @@
 #
 
 from skywalking import Layer, Component, config
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpStatusCode
 
 link_vector = ['https://requests.readthedocs.io/en/master/']
@@ -49,7 +48,7 @@ def install():
                             proxies,
                             hooks, stream, verify, cert, json)
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_exit_span(op=url_param.path or '/', peer=url_param.netloc,
                                              component=Component.Requests)
 
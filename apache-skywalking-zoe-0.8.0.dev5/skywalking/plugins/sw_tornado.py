@@ -19,8 +19,7 @@ from inspect import iscoroutinefunction, isawaitable
 
 from skywalking import Layer, Component, config
 from skywalking.trace.carrier import Carrier
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpStatusCode
 
 # version_rule = {
@@ -69,7 +68,7 @@ def _gen_sw_get_response_func(old_execute):
                 if item.key.capitalize() in request.headers:
                     item.val = request.headers[item.key.capitalize()]
 
-            span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+            span = noop_span if config.ignore_http_method_check(method) \
                 else get_context().new_entry_span(op=request.path, carrier=carrier)
 
             with span:
@@ -103,7 +102,7 @@ def _gen_sw_get_response_func(old_execute):
                 if item.key.capitalize() in request.headers:
                     item.val = request.headers[item.key.capitalize()]
 
-            span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+            span = noop_span if config.ignore_http_method_check(method) \
                 else get_context().new_entry_span(op=request.path, carrier=carrier)
 
             with span:
@@ -16,8 +16,7 @@
 #
 
 from skywalking import Layer, Component, config
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpStatusCode
 
 link_vector = ['https://urllib3.readthedocs.io/en/latest/']
@@ -39,7 +38,7 @@ def install():
 
         url_param = sw_urlparse(url)
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_exit_span(op=url_param.path or '/', peer=url_param.netloc,
                                              component=Component.Urllib3)
 
@@ -18,8 +18,7 @@
 from urllib.request import Request
 
 from skywalking import Layer, Component, config
-from skywalking.trace.context import get_context, NoopContext
-from skywalking.trace.span import NoopSpan
+from skywalking.trace.context import get_context, noop_span
 from skywalking.trace.tags import TagHttpMethod, TagHttpURL, TagHttpStatusCode
 
 link_vector = ['https://docs.python.org/3/library/urllib.request.html']
@@ -45,7 +44,7 @@ def install():
         url = fullurl.selector.split('?')[0] if fullurl.selector else '/'
         method = getattr(fullurl, 'method', None) or ('GET' if data is None else 'POST')
 
-        span = NoopSpan(NoopContext()) if config.ignore_http_method_check(method) \
+        span = noop_span if config.ignore_http_method_check(method) \
             else get_context().new_exit_span(op=url, peer=fullurl.host, component=Component.General)
 
         with span:
@@ -15,14 +15,25 @@
 # limitations under the License.
 #
 
+from skywalking import config
+
 profile_task_execution_service = None
+continuous_profiler = None
 
 
 def init():
+    from skywalking.profile.continuous import ContinuousProfiler
     from skywalking.profile.profile_service import ProfileTaskExecutionService
 
-    global profile_task_execution_service
+    global profile_task_execution_service, continuous_profiler
     if profile_task_execution_service:
         return
 
     profile_task_execution_service = ProfileTaskExecutionService()
+
+    if config.continuous_profile_active:
+        continuous_profiler = ContinuousProfiler(config.continuous_profile_hz, config.continuous_profile_dir,
+                                                 config.continuous_profile_rotate_interval * 60,
+                                                 config.continuous_profile_max_nodes,
+                                                 config.continuous_profile_cpu_budget,
+                                                 config.continuous_profile_max_files)
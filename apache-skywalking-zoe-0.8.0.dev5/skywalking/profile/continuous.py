@@ -0,0 +1,246 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import selectors
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from skywalking import config
+from skywalking.loggings import logger
+from skywalking.profile.stack import walk
+from skywalking.utils.time import thread_time
+
+_PACKAGE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _idle_codes() -> set:
+    """
+    the functions a thread is found in while it waits, on a lock, a condition or an event, or for a socket, the blocking
+    call itself is native so these are the innermost python frames of a waiting thread
+    """
+    functions = [threading.Condition.wait, getattr(threading.Thread, '_wait_for_tstate_lock', None),
+                 socket.socket.accept]
+    for name in ('SelectSelector', 'PollSelector', 'EpollSelector', 'DevpollSelector', 'KqueueSelector'):
+        selector = getattr(selectors, name, None)
+        if selector is not None:
+            functions.append(selector.select)
+    return {function.__code__ for function in functions if function is not None}
+
+
+_IDLE_CODES = _idle_codes()
+
+
+def _is_agent_thread(frame) -> bool:
+    """
+    whether the thread of `frame` was started by the agent, its entry point being in the skywalking package
+    """
+    entry = None
+    while frame is not None:  # the outermost frame outside of the threading module
+        if frame.f_code.co_filename != threading.__file__:
+            entry = frame
+        frame = frame.f_back
+    return entry is not None and entry.f_code.co_filename.startswith(_PACKAGE)
+
+
+class _Node:
+    __slots__ = ('children', 'count')
+
+    def __init__(self):
+        self.children = {}  # type: Dict[str, _Node]
+        self.count = 0  # samples whose stack ends at this frame
+
+
+class FoldedStacks:
+    """
+    Sample counts of the stacks seen, kept as a trie of frames so that shared callers are stored once. The trie holds
+    at most `max_nodes` frames, a stack reaching past the bound is counted at its deepest frame already in the trie.
+    """
+
+    def __init__(self, max_nodes: int):
+        self.max_nodes = max_nodes
+        self.root = _Node()
+        self.nodes = 0
+        self.samples = 0
+        self.truncated = 0
+
+    def add(self, stack: List[str]):
+        """
+        :param stack: code signatures, outermost first
+        """
+        node = self.root
+        for signature in stack:
+            child = node.children.get(signature)
+            if child is None:
+                if self.nodes >= self.max_nodes:
+                    self.truncated += 1
+                    break
+                child = node.children[signature] = _Node()
+                self.nodes += 1
+            node = child
+
+        node.count += 1
+        self.samples += 1
+
+    def folded(self) -> Iterator[str]:
+        """
+        the collapsed stack lines read by flamegraph.pl, speedscope and similar tools, `frame;frame;frame count`
+        """
+        pending = [(self.root, '')]
+        while pending:
+            node, path = pending.pop()
+            if node.count and path:
+                yield f'{path} {node.count}'
+            for signature, child in node.children.items():
+                pending.append((child, f'{path};{signature}' if path else signature))
+
+
+class ContinuousProfiler:
+    """
+    Samples the stacks of every thread of the process at a low rate, whether or not a profile task is running, and
+    writes the aggregated stacks as a collapsed stack file every `rotate_interval` seconds. The threads of the agent
+    and the threads waiting on a lock or a socket are left out, only the latest `max_files` files of the service are
+    kept in the directory.
+
+    The cpu time spent sampling is measured on every tick, the sampling period is stretched whenever it would exceed
+    `cpu_budget` percent of a core.
+    """
+
+    def __init__(self, hz: float, directory: str, rotate_interval: float, max_nodes: int, cpu_budget: float,
+                 max_files: int):
+        self.period = 1 / hz  # type: float
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'skywalking-profiles')  # type: str
+        self.rotate_interval = rotate_interval  # type: float
+        self.max_nodes = max_nodes  # type: int
+        self.cpu_budget = cpu_budget / 100  # type: float
+        self.max_files = max_files  # type: int
+
+        self.stacks = FoldedStacks(max_nodes)
+        self.started_at = time.time()  # type: float
+        self._stopped = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(name='ContinuousProfileThread', target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        stop sampling and write out the stacks of the current interval
+        """
+        self.pause()
+        self.rotate()
+
+    def pause(self):
+        """
+        stop sampling, e.g. while the process forks, the stacks of the current interval are kept until `start`
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def fork_after_in_child(self):
+        # the sampling thread is gone and the stacks so far are the parent's to write
+        self._thread = None
+        self.stacks = FoldedStacks(self.max_nodes)
+        self.started_at = time.time()
+
+    def sample(self):
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me or frame.f_code in _IDLE_CODES or _is_agent_thread(frame):
+                continue
+            self.stacks.add(walk(frame, keep_leaves=True))
+
+    def rotate(self) -> Optional[str]:
+        """
+        write the stacks sampled since the last rotation and start over, returns the path of the file written
+        """
+        stacks, started_at = self.stacks, self.started_at
+        self.stacks = FoldedStacks(self.max_nodes)
+        self.started_at = time.time()
+        if not stacks.samples:
+            return None
+
+        if stacks.truncated:
+            logger.warning('continuous profile truncated %d of %d stacks at %d frames, raise '
+                           'SW_AGENT_CONTINUOUS_PROFILE_MAX_NODES for full stacks', stacks.truncated, stacks.samples,
+                           self.max_nodes)
+
+        name = f"{config.service_name}-{os.getpid()}-{time.strftime('%Y%m%d%H%M%S', time.localtime(started_at))}"
+        path = os.path.join(self.directory, f'{name}.folded')
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(f'{path}.tmp', 'w') as file:
+                for line in stacks.folded():
+                    file.write(line)
+                    file.write('\n')
+            os.replace(f'{path}.tmp', path)  # readers never see a partial file
+        except OSError as e:
+            logger.error('failed to write continuous profile %s: %s', path, e)
+            return None
+
+        self._expire()
+        return path
+
+    def _expire(self):
+        """
+        remove the oldest files of the service beyond `max_files`, whichever of its processes wrote them
+        """
+        if self.max_files <= 0:
+            return
+
+        prefix = f'{config.service_name}-'
+        try:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                     if name.startswith(prefix) and name.endswith('.folded')]
+            paths.sort(key=os.path.getmtime)
+        except OSError:  # removed meanwhile by another process of the service
+            return
+
+        for path in paths[:-self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _run(self):
+        period = self.period
+        rotate_at = self.started_at + self.rotate_interval
+
+        while not self._stopped.wait(period):
+            cpu_start = thread_time()
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error('continuous profile sampling failed: %s', e)
+
+            cost = thread_time() - cpu_start
+            period = max(self.period, cost / self.cpu_budget) if self.cpu_budget > 0 else self.period
+
+            if time.time() >= rotate_at:
+                self.rotate()
+                rotate_at = self.started_at + self.rotate_interval
@@ -15,11 +15,11 @@
 # limitations under the License.
 #
 
+import asyncio
 import sys
-import time
-import traceback
-from threading import Thread, Event, current_thread
-from typing import Optional
+from threading import Thread, current_thread
+from types import FrameType
+from typing import List, Optional
 
 from skywalking import agent
 from skywalking import config
@@ -27,12 +27,26 @@ from skywalking import profile
 from skywalking.loggings import logger
 from skywalking.profile.profile_status import ProfileStatusReference, ProfileStatus
 from skywalking.profile.profile_task import ProfileTask
-from skywalking.profile.snapshot import TracingThreadSnapshot
+from skywalking.profile.snapshot import TracingThreadSnapshot, StackTable
+from skywalking.profile.stack import walk
 from skywalking.trace.context import SpanContext
 from skywalking.utils.array import AtomicArray
 from skywalking.utils.integer import AtomicInteger
+from skywalking.utils.scheduler import Timer, scheduler
 from skywalking.utils.time import current_milli_time
 
+try:
+    _current_task = asyncio.current_task
+except AttributeError:  # python 3.6
+    _current_task = asyncio.Task.current_task
+
+
+def current_task() -> Optional[asyncio.Task]:
+    try:
+        return _current_task()
+    except RuntimeError:  # no event loop running in this thread
+        return None
+
 
 class ProfileTaskExecutionContext:
     def __init__(self, task: ProfileTask):
@@ -40,19 +54,19 @@ class ProfileTaskExecutionContext:
         self._current_profiling_cnt = AtomicInteger(var=0)
         self._total_started_profiling_cnt = AtomicInteger(var=0)
         self.profiling_segment_slots = AtomicArray(length=config.profile_max_parallel)
-        self._profiling_thread = None  # type: Optional[Thread]
-        self._profiling_stop_event = None  # type: Optional[Event]
+        self.stacks = StackTable()
+        self._dumper = None  # type: Optional[ProfileDumper]
+        self._profiling_timer = None  # type: Optional[Timer]
 
     def start_profiling(self):
-        profile_thread = ProfileThread(self)
-        self._profiling_stop_event = Event()
-
-        self._profiling_thread = Thread(target=profile_thread.start, args=[self._profiling_stop_event], daemon=True)
-        self._profiling_thread.start()
+        self._dumper = ProfileDumper(self)
+        period = self.task.thread_dump_period / 1000
+        self._profiling_timer = scheduler.schedule(0, self._dumper.dump, period=period)
 
     def stop_profiling(self):
-        if self._profiling_thread is not None and self._profiling_stop_event is not None:
-            self._profiling_stop_event.set()
+        if self._profiling_timer is not None and self._dumper is not None:
+            self._profiling_timer.cancel()
+            self._dumper.flush()
 
     def attempt_profiling(self, trace_context: SpanContext, segment_id: str, first_span_opname: str) -> \
             ProfileStatusReference:
@@ -78,10 +92,19 @@ class ProfileTaskExecutionContext:
                                                            using_slot_cnt + 1):
             return ProfileStatusReference.create_with_none()
 
-        thread_profiler = ThreadProfiler(trace_context=trace_context,
-                                         segment_id=segment_id,
-                                         profiling_thread=current_thread(),
-                                         profile_context=self)
+        # every task of an event loop runs on the same thread, its stack only belongs to this segment while the task
+        # owning the entry span is the one running
+        task = current_task()
+        if task is not None:
+            thread_profiler = TaskProfiler(trace_context=trace_context,
+                                           segment_id=segment_id,
+                                           profiling_task=task,
+                                           profile_context=self)
+        else:
+            thread_profiler = ThreadProfiler(trace_context=trace_context,
+                                             segment_id=segment_id,
+                                             profiling_thread=current_thread(),
+                                             profile_context=self)
 
         slot_length = self.profiling_segment_slots.length()
         for idx in range(slot_length):
@@ -108,6 +131,8 @@ class ProfileTaskExecutionContext:
             if profiler and profiler.matches(trace_context):
                 self.profiling_segment_slots.set(idx, None)
                 profiler.stop_profiling()
+                for snapshot in profiler.flush():
+                    agent.add_profiling_snapshot(snapshot)
                 self._current_profiling_cnt.add_and_get(-1)
                 break
 
@@ -115,49 +140,51 @@ class ProfileTaskExecutionContext:
         return self._total_started_profiling_cnt.add_and_get(1) <= self.task.max_sampling_count
 
 
-class ProfileThread:
+class ProfileDumper:
+    """
+    dumps the profiled stacks of a task once every dump period, run by the scheduler rather than a thread of its own
+    """
+
     def __init__(self, context: ProfileTaskExecutionContext):
         self._task_execution_context = context
         self._task_execution_service = profile.profile_task_execution_service
-        self._stop_event = None  # type: Optional[Event]
-
-    def start(self, stop_event: Event):
-        self._stop_event = stop_event
 
+    def dump(self):
         try:
             self.profiling(self._task_execution_context)
         except Exception as e:
             logger.error('profiling task fail. task_id:[%s] error:[%s]', self._task_execution_context.task.task_id, e)
-        finally:
             self._task_execution_service.stop_current_profile_task(self._task_execution_context)
 
-    def profiling(self, context: ProfileTaskExecutionContext):
-        max_sleep_period = context.task.thread_dump_period
-
-        while not self._stop_event.is_set():
-            current_loop_start_time = current_milli_time()
-            profilers = self._task_execution_context.profiling_segment_slots
+    def flush(self):
+        # the held back ends of unchanged stacks
+        for profiler in self._task_execution_context.profiling_segment_slots:  # type: ThreadProfiler
+            if profiler is not None:
+                for snapshot in profiler.flush():
+                    agent.add_profiling_snapshot(snapshot)
 
-            for profiler in profilers:  # type: ThreadProfiler
-                if profiler is None:
+    def profiling(self, context: ProfileTaskExecutionContext):
+        profilers = self._task_execution_context.profiling_segment_slots
+        frames = None
+
+        for profiler in profilers:  # type: ThreadProfiler
+            if profiler is None:
+                continue
+
+            if profiler.profile_status.get() is ProfileStatus.PENDING:
+                profiler.start_profiling_if_need()
+            elif profiler.profile_status.get() is ProfileStatus.PROFILING:
+                if frames is None:  # the frames of every thread at once, shared by all profilers of this tick
+                    frames = sys._current_frames()
+                if not profiler.is_running(frames):
                     continue
-
-                if profiler.profile_status.get() is ProfileStatus.PENDING:
-                    profiler.start_profiling_if_need()
-                elif profiler.profile_status.get() is ProfileStatus.PROFILING:
-                    snapshot = profiler.build_snapshot()
-                    if snapshot is not None:
+                snapshots = profiler.dump(frames)
+                if snapshots is not None:
+                    for snapshot in snapshots:
                         agent.add_profiling_snapshot(snapshot)
-                    else:
-                        # tell execution context current tracing thread dump failed, stop it
-                        context.stop_tracing_profile(profiler.trace_context)
-
-            need_sleep = (current_loop_start_time + max_sleep_period) - current_milli_time()
-            if not need_sleep > 0:
-                need_sleep = max_sleep_period
-
-            # convert to float second
-            time.sleep(need_sleep / 1000)
+                else:
+                    # tell execution context current tracing thread dump failed, stop it
+                    context.stop_tracing_profile(profiler.trace_context)
 
 
 class ThreadProfiler:
@@ -171,6 +198,8 @@ class ThreadProfiler:
         self.profiling_max_time_mills = config.profile_duration * 60 * 1000
 
         self.dump_sequence = 0
+        self._sent = None  # type: Optional[TracingThreadSnapshot]
+        self._held = None  # type: Optional[TracingThreadSnapshot]
 
         if trace_context.profile_status is None:
             self.profile_status = ProfileStatusReference.create_with_pending()
@@ -186,38 +215,110 @@ class ThreadProfiler:
     def stop_profiling(self):
         self.trace_context.profile_status.update_status(ProfileStatus.STOPPED)
 
-    def build_snapshot(self) -> Optional[TracingThreadSnapshot]:
+    def build_snapshot(self, frames: dict) -> Optional[TracingThreadSnapshot]:
+        """
+        :param frames: the current frames of all threads, as returned by sys._current_frames()
+        """
         if not self._profiling_thread.is_alive():
             return None
 
         current_time = current_milli_time()
 
-        stack_list = []
+        stack_list = self._stack(frames)
+        if not stack_list:
+            return None
 
-        # get thread stack of target thread
-        stack = sys._current_frames().get(int(self._profiling_thread.ident))
-        if not stack:
+        # if is first dump, check is can start profiling
+        if self.dump_sequence == 0 and not self._profile_context.is_start_profileable():
             return None
 
-        extracted = traceback.extract_stack(stack)
-        for idx, item in enumerate(extracted):
-            if idx > config.profile_dump_max_stack_depth:
-                break
+        stacks = self._profile_context.stacks
+        return TracingThreadSnapshot(self._profile_context.task.task_id,
+                                     self._segment_id,
+                                     self.dump_sequence,
+                                     current_time,
+                                     stacks.intern(stack_list))
 
-            code_sig = f'{item.filename}.{item.name}: {item.lineno}'
-            stack_list.append(code_sig)
+    def dump(self, frames: dict) -> Optional[List[TracingThreadSnapshot]]:
+        """
+        the snapshots to send for this tick, None when the segment can't be profiled any more
 
-        # if is first dump, check is can start profiling
-        if self.dump_sequence == 0 and not self._profile_context.is_start_profileable():
+        of consecutive dumps with an unchanged stack only the first is sent right away, the latest is held back until
+        the stack changes, the run keeps its start and end times while the sequence numbers stay contiguous
+        """
+        snapshot = self.build_snapshot(frames)
+        if snapshot is None:
             return None
 
-        t = TracingThreadSnapshot(self._profile_context.task.task_id,
-                                  self._segment_id,
-                                  self.dump_sequence,
-                                  current_time,
-                                  stack_list)
+        # interned stacks are compared by identity first, a stack not interned once the table is full by value
+        if config.profile_snapshot_coalesce and self._sent is not None and snapshot.stack_list == self._sent.stack_list:
+            self._held = snapshot
+            return []
+
+        snapshots = self.flush()
+        snapshots.append(self._number(snapshot))
+        self._sent = snapshot
+        return snapshots
+
+    def flush(self) -> List[TracingThreadSnapshot]:
+        held, self._held = self._held, None
+        return [self._number(held)] if held is not None else []
+
+    def _number(self, snapshot: TracingThreadSnapshot) -> TracingThreadSnapshot:
+        snapshot.sequence = self.dump_sequence
         self.dump_sequence += 1
-        return t
+        return snapshot
 
     def matches(self, trace_context: SpanContext) -> bool:
         return self.trace_context == trace_context
+
+    def is_running(self, frames: dict) -> bool:
+        """
+        whether the code being profiled is on the cpu of its thread, threads are sampled even when idle
+        """
+        return True
+
+    def _stack(self, frames: dict) -> Optional[List[str]]:
+        # get thread stack of target thread
+        stack = frames.get(int(self._profiling_thread.ident))
+        if not stack:
+            return None
+
+        return walk(stack)
+
+
+class TaskProfiler(ThreadProfiler):
+    """
+    Profiles the asyncio task owning the entry span. The event loop thread is only sampled while the task's coroutine
+    is on its stack, and only the frames from the coroutine up are kept, other ticks are skipped.
+    """
+
+    def __init__(self, trace_context: SpanContext, segment_id: str, profiling_task: asyncio.Task,
+                 profile_context: ProfileTaskExecutionContext):
+        super().__init__(trace_context, segment_id, current_thread(), profile_context)
+        self._profiling_task = profiling_task
+        # Task.get_coro is python 3.8+, the coroutine is only kept in a private attribute before
+        get_coro = getattr(profiling_task, 'get_coro', None)
+        self._coro = get_coro() if get_coro is not None else profiling_task._coro
+        self._coro_frame = None  # type: Optional[FrameType]
+
+    def is_running(self, frames: dict) -> bool:
+        coro = self._coro
+        self._coro_frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if self._coro_frame is None:  # finished, build_snapshot stops profiling it
+            return True
+
+        frame = frames.get(int(self._profiling_thread.ident))
+        while frame is not None:
+            if frame is self._coro_frame:
+                return True
+            frame = frame.f_back
+
+        return False
+
+    def _stack(self, frames: dict) -> Optional[List[str]]:
+        stack = frames.get(int(self._profiling_thread.ident))
+        if not stack or self._coro_frame is None:
+            return None
+
+        return walk(stack, self._coro_frame)
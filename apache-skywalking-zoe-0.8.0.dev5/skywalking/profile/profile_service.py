@@ -15,10 +15,8 @@
 # limitations under the License.
 #
 
-from concurrent.futures import ThreadPoolExecutor
-from queue import Queue
-from threading import Timer, RLock, Lock
-from typing import Tuple
+from threading import RLock, Lock
+from typing import Dict, Tuple
 
 from skywalking import agent
 from skywalking.loggings import logger, logger_debug_enabled
@@ -28,37 +26,23 @@ from skywalking.profile.profile_status import ProfileStatusReference
 from skywalking.profile.profile_task import ProfileTask
 from skywalking.trace.context import SpanContext
 from skywalking.utils.atomic_ref import AtomicRef
+from skywalking.utils.scheduler import scheduler
 from skywalking.utils.time import current_milli_time
 
 
-class Scheduler:
-
-    @staticmethod
-    def schedule(milliseconds, func, *args, **kwargs):
-        seconds = milliseconds / 1000
-        if seconds < 0:
-            seconds = 0
-
-        t = Timer(seconds, func, *args, **kwargs)
-        t.daemon = True
-        t.start()
-
-
 class ProfileTaskExecutionService:
     MINUTE_TO_MILLIS = 60000
 
     def __init__(self):
-        # Queue is thread safe
-        self._profile_task_list = Queue()  # type: Queue
-        # queue_lock for making sure complex operation of this profile_task_list is thread safe
+        # the tasks waiting or running, by task id
+        self._profile_task_list = {}  # type: Dict[str, ProfileTask]
+        # queue_lock for making sure operations on profile_task_list are thread safe
         self.queue_lock = Lock()
 
         self._last_command_create_time = -1  # type: int
-        # single thread executor
-        self.profile_executor = ThreadPoolExecutor(max_workers=1)
         self.task_execution_context = AtomicRef(None)
 
-        self.profile_task_scheduler = Scheduler()
+        self.profile_task_scheduler = scheduler
 
         # rlock for process_profile_task and stop_current_profile_task
         self._rlock = RLock()
@@ -68,22 +52,7 @@ class ProfileTaskExecutionService:
         Remove a task from profile_task_list in a thread safe state
         """
         with self.queue_lock:
-            item_left = []
-            result = False
-
-            while not self._profile_task_list.empty():
-                item = self._profile_task_list.get()
-                if item == task:
-                    result = True
-                    # not put in item_list for removing it
-                    continue
-
-                item_left.append(item)
-
-            for item in item_left:
-                self._profile_task_list.put(item)
-
-            return result
+            return self._profile_task_list.pop(task.task_id, None) is not None
 
     def get_last_command_create_time(self) -> int:
         return self._last_command_create_time
@@ -93,18 +62,18 @@ class ProfileTaskExecutionService:
         if task.create_time > self._last_command_create_time:
             self._last_command_create_time = task.create_time
 
-        # check profile task object
-        success, error_reason = self._check_profile_task(task)
+        # check profile task object and add it to the list at once, so no overlapping task gets in between
+        with self.queue_lock:
+            success, error_reason = self._check_profile_task(task)
+            if success:
+                self._profile_task_list[task.task_id] = task
         if not success:
             logger.warning('check command error, cannot process this profile task. reason: %s', error_reason)
             return
 
-        # add task to list
-        self._profile_task_list.put(task)
-
         delay_millis = task.start_time - current_milli_time()
         # schedule to start task
-        self.profile_task_scheduler.schedule(delay_millis, self.process_profile_task, [task])
+        self.profile_task_scheduler.schedule(delay_millis / 1000, self.process_profile_task, task)
 
     def add_profiling(self, context: SpanContext, segment_id: str, first_span_opname: str) -> ProfileStatusReference:
         execution_context = self.task_execution_context.get()  # type: ProfileTaskExecutionContext
@@ -139,7 +108,7 @@ class ProfileTaskExecutionService:
                 logger.debug('profile task [%s] for endpoint [%s] started', task.task_id, task.first_span_op_name)
 
             millis = task.duration * self.MINUTE_TO_MILLIS
-            self.profile_task_scheduler.schedule(millis, self.stop_current_profile_task, [current_context])
+            self.profile_task_scheduler.schedule(millis / 1000, self.stop_current_profile_task, current_context)
 
     def stop_current_profile_task(self, need_stop: ProfileTaskExecutionContext):
         with self._rlock:
@@ -154,8 +123,8 @@ class ProfileTaskExecutionService:
 
             self.remove_from_profile_task_list(need_stop.task)
 
-            # notify profiling task has finished
-            agent.notify_profile_finish(need_stop.task)
+            # notify profiling task has finished, off the scheduler thread as it calls the backend
+            self.profile_task_scheduler.schedule(0, agent.notify_profile_finish, need_stop.task, blocking=True)
 
     def _check_profile_task(self, task: ProfileTask) -> Tuple[bool, str]:
         try:
@@ -190,15 +159,14 @@ class ProfileTaskExecutionService:
             # check task queue
             task_finish_time = self._cal_profile_task_finish_time(task)
 
-            # lock the self._profile_task_list.queue when check the item in it, avoid concurrency errors
-            with self._profile_task_list.mutex:
-                for profile_task in self._profile_task_list.queue:  # type: ProfileTask
-                    # if the end time of the task to be added is during the execution of any data, means is a error data
-                    if task.start_time <= task_finish_time <= self._cal_profile_task_finish_time(profile_task):
-                        return (False,
-                                f'there already have processing task in time range, '
-                                f'could not add a new task again. processing task '
-                                f'monitor endpoint name: {profile_task.first_span_op_name}')
+            # called with queue_lock held
+            for profile_task in self._profile_task_list.values():  # type: ProfileTask
+                # if the end time of the task to be added is during the execution of any data, means is a error data
+                if task.start_time <= task_finish_time <= self._cal_profile_task_finish_time(profile_task):
+                    return (False,
+                            f'there already have processing task in time range, '
+                            f'could not add a new task again. processing task '
+                            f'monitor endpoint name: {profile_task.first_span_op_name}')
 
             return True, ''
 
@@ -15,14 +15,36 @@
 # limitations under the License.
 #
 
-from typing import List
+from typing import Dict, List, Tuple
 
 from skywalking.protocol.profile.Profile_pb2 import ThreadSnapshot, ThreadStack
 
 
+class StackTable:
+    """
+    The distinct stacks dumped for one profile task, every snapshot of the same stack waiting in the queue shares one
+    tuple instead of holding its own list of signatures.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._stacks = {}  # type: Dict[Tuple[str, ...], Tuple[str, ...]]
+
+    def intern(self, stack_list: List[str]) -> Tuple[str, ...]:
+        stack = tuple(stack_list)
+        interned = self._stacks.get(stack)
+        if interned is not None:
+            return interned
+        if len(self._stacks) >= self.max_size:  # full, the stack is still profiled but not shared
+            return stack
+
+        self._stacks[stack] = stack
+        return stack
+
+
 class TracingThreadSnapshot:
 
-    def __init__(self, task_id: str, trace_segment_id: str, sequence: int, time: int, stack_list: List[str]):
+    def __init__(self, task_id: str, trace_segment_id: str, sequence: int, time: int, stack_list: Tuple[str, ...]):
         self.task_id = task_id
         self.trace_segment_id = trace_segment_id
         self.sequence = sequence
@@ -30,15 +52,12 @@ class TracingThreadSnapshot:
         self.stack_list = stack_list
 
     def transform(self) -> ThreadSnapshot:
-        code_sigs = list(self.stack_list)
-        stack = ThreadStack(codeSignatures=code_sigs)
-
         snapshot = ThreadSnapshot(
             taskId=str(self.task_id),
             traceSegmentId=str(self.trace_segment_id),
             time=int(self.time),
             sequence=int(self.sequence),
-            stack=stack
+            stack=ThreadStack(codeSignatures=self.stack_list)
         )
 
         return snapshot
@@ -0,0 +1,65 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from types import CodeType, FrameType
+from typing import Dict, List, Tuple
+
+from skywalking import config
+
+# the signatures of the lines of each code object by id, the code object is kept so that its id can't be reused
+_signatures = {}  # type: Dict[int, Tuple[CodeType, Dict[int, str]]]
+_MAX_CODES = 16384
+
+
+def code_signature(code: CodeType, lineno: int) -> str:
+    """
+    the signature of a line of code, interned so that every sample of the same line shares one string, hashing the
+    code object itself would cost more than formatting the string
+    """
+    entry = _signatures.get(id(code))
+    if entry is None or entry[0] is not code:
+        if len(_signatures) >= _MAX_CODES:
+            _signatures.clear()
+        entry = _signatures[id(code)] = (code, {})
+
+    signature = entry[1].get(lineno)
+    if signature is None:
+        signature = entry[1][lineno] = f'{code.co_filename}.{code.co_name}: {lineno}'
+    return signature
+
+
+def walk(frame: FrameType, outermost: FrameType = None, keep_leaves: bool = False) -> List[str]:
+    """
+    the code signatures of `frame` and its callers up to `outermost` or the bottom of the stack, outermost first like
+    traceback.extract_stack but without reading the source lines through linecache
+
+    a stack deeper than config.profile_dump_max_stack_depth is cut off on the leaf side, or on the root side when
+    `keep_leaves` is set, so that the frames actually running are kept
+    """
+    depth = config.profile_dump_max_stack_depth + 1
+    stack = []
+    while frame is not None:
+        if keep_leaves and len(stack) == depth:
+            break
+        stack.append(code_signature(frame.f_code, frame.f_lineno))
+        if frame is outermost:
+            break
+        frame = frame.f_back
+
+    stack.reverse()
+    del stack[depth:]
+    return stack
@@ -0,0 +1,113 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import random
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+from skywalking import config
+from skywalking.loggings import logger
+
+
+class TokenBucket:
+    """
+    allows `rate` acquisitions per second on average, with bursts up to `capacity`
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate  # type: float
+        self.capacity = capacity or max(rate, 1)  # type: float
+        self._tokens = self.capacity  # type: float
+        self._last = time.monotonic()  # type: float
+        self._lock = Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+
+class HeadSampler:
+    # the adaptive rate never goes below this, so that some traces are always reported
+    MIN_ADAPTIVE_RATE = 0.01
+    # seconds of report thread activity aggregated before the adaptive rate is adjusted
+    ADJUST_INTERVAL = 5
+
+    def __init__(self):
+        self.rate = config.sample_rate  # type: float
+        # type: Dict[str, TokenBucket]
+        self.endpoint_buckets = self._parse_endpoint_limits(config.sample_endpoint_limits)
+        self.default_bucket = self.endpoint_buckets.pop('*', None)  # type: Optional[TokenBucket]
+
+        self.cpu_budget = config.sample_cpu_budget / 100  # type: float
+        self.adaptive_rate = 1.0  # type: float
+        self._cpu_time = 0.0  # type: float
+        self._wall_time = 0.0  # type: float
+
+    @staticmethod
+    def _parse_endpoint_limits(limits: str) -> Dict[str, TokenBucket]:
+        buckets = {}
+        for limit in limits.split(','):
+            if not limit.strip():
+                continue
+            endpoint, _, rate = limit.strip().rpartition('=')
+            try:
+                buckets[endpoint] = TokenBucket(float(rate))
+            except ValueError:
+                logger.warning('invalid sampling limit [%s], it should be in the format of <endpoint>=<traces/s>',
+                               limit)
+        return buckets
+
+    def try_sampling(self, op: str) -> bool:
+        """
+        decide whether a new trace starting with the operation `op` should be sampled
+        """
+        rate = self.rate * self.adaptive_rate
+        if rate < 1 and random.random() >= rate:
+            return False
+
+        bucket = self.endpoint_buckets.get(op, self.default_bucket)
+        return bucket is None or bucket.try_acquire()
+
+    def record_report_time(self, cpu_time: float, wall_time: float):
+        """
+        feed the cpu time the agent spent reporting during `wall_time` seconds, used to adapt the sampling rate to
+        SW_AGENT_SAMPLE_CPU_BUDGET
+        """
+        if self.cpu_budget <= 0:
+            return
+
+        self._cpu_time += cpu_time
+        self._wall_time += wall_time
+        if self._wall_time < self.ADJUST_INTERVAL:
+            return
+
+        usage = self._cpu_time / self._wall_time
+        self._cpu_time = self._wall_time = 0.0
+
+        if usage > self.cpu_budget:  # shrink proportionally to how much the budget was exceeded
+            self.adaptive_rate = max(self.MIN_ADAPTIVE_RATE, self.adaptive_rate * self.cpu_budget / usage)
+        else:  # recover slowly to avoid oscillating around the budget
+            self.adaptive_rate = min(1.0, self.adaptive_rate * 1.1)
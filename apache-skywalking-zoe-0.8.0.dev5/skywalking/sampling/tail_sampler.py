@@ -0,0 +1,150 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import time
+import zlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from skywalking import config, telemetry
+
+if TYPE_CHECKING:
+    from skywalking.trace.segment import Segment
+
+
+class TailSampler:
+    """
+    Sits between finished segments and the report queue, and only forwards traces worth looking at: slow ones,
+    errored ones, ones carrying a configured tag, plus a baseline share of everything else.
+
+    Segments of a trace that is not (yet) interesting are held for a short while, so that a later segment of the
+    same trace in this process (e.g. from another thread) can still decide to keep the whole trace. The traces held
+    long enough are decided by the report loop calling `flush`, the segments not kept are counted as dropped.
+    """
+
+    def __init__(self, forward: Callable[['Segment'], None]):
+        self.forward = forward
+        self.latency_threshold = config.tail_sample_latency_threshold  # type: int
+        self.baseline = int(config.tail_sample_baseline_rate * 10000)  # type: int
+        self.hold_time = config.tail_sample_hold_time / 1000  # type: float
+        self.max_held = config.tail_sample_buffer_size  # type: int
+        self.tags = self._parse_tags(config.tail_sample_tags)  # type: Dict[str, Optional[str]]
+
+        self._held = OrderedDict()  # type: OrderedDict  # trace id -> (deadline, segments)
+        self._nheld = 0  # type: int
+        self._dropped = 0  # type: int  # segments decided not to be kept, not yet counted in telemetry.drops
+        self._kept = OrderedDict()  # type: OrderedDict  # trace ids already decided to be kept, as an LRU
+        self._lock = Lock()
+
+    @staticmethod
+    def _parse_tags(tags: str) -> Dict[str, Optional[str]]:
+        predicates = {}
+        for tag in tags.split(','):
+            key, sep, val = tag.strip().partition('=')
+            if key:
+                predicates[key] = val if sep else None
+        return predicates
+
+    def is_interesting(self, segment: 'Segment') -> bool:
+        spans = segment.spans
+        if not spans:
+            return False
+
+        if max(span.end_time for span in spans) - min(span.start_time for span in spans) >= self.latency_threshold:
+            return True
+
+        for span in spans:
+            if span.error_occurred:
+                return True
+            if self.tags:
+                for tag in span.iter_tags():
+                    if tag.key in self.tags and self.tags[tag.key] in (None, str(tag.val)):
+                        return True
+
+        return False
+
+    def in_baseline(self, trace_id: str) -> bool:
+        # hash instead of random, so that services sharing the same baseline rate keep the same traces
+        return zlib.crc32(trace_id.encode('utf8')) % 10000 < self.baseline
+
+    def offer(self, segment: 'Segment'):
+        trace_id = str(segment.related_traces[0])
+        interesting = self.is_interesting(segment)  # only reads the segment, outside of the lock
+        keep = []
+
+        with self._lock:
+            if interesting or trace_id in self._kept:
+                keep = self._keep(trace_id)
+                keep.append(segment)
+            else:
+                if trace_id not in self._held:
+                    self._held[trace_id] = (time.monotonic() + self.hold_time, [])
+                self._held[trace_id][1].append(segment)
+                self._nheld += 1
+
+                while self._nheld > self.max_held:  # bounded memory, decide the oldest traces right away
+                    keep.extend(self._decide(*self._held.popitem(last=False)))
+            dropped, self._dropped = self._dropped, 0
+
+        for kept in keep:
+            self.forward(kept)
+        if dropped:
+            telemetry.drops.record('tail_sample', dropped)
+
+    def flush(self, force: bool = False):
+        """
+        decide the traces that have been held long enough, or all of them if `force` is set
+        """
+        keep = []
+        now = time.monotonic()
+
+        with self._lock:
+            while self._held:
+                deadline = next(iter(self._held.values()))[0]
+                if not force and deadline > now:
+                    break
+                keep.extend(self._decide(*self._held.popitem(last=False)))
+            dropped, self._dropped = self._dropped, 0
+
+        for kept in keep:
+            self.forward(kept)
+        if dropped:
+            telemetry.drops.record('tail_sample', dropped)
+
+    def _decide(self, trace_id: str, held: Tuple[float, List['Segment']]) -> List['Segment']:
+        segments = held[1]
+        self._nheld -= len(segments)
+        if self.in_baseline(trace_id):
+            self._mark_kept(trace_id)
+            return segments
+        self._dropped += len(segments)
+        return []
+
+    def _keep(self, trace_id: str) -> List['Segment']:
+        self._mark_kept(trace_id)
+        held = self._held.pop(trace_id, None)
+        if held is None:
+            return []
+        self._nheld -= len(held[1])
+        return held[1]
+
+    def _mark_kept(self, trace_id: str):
+        self._kept[trace_id] = None
+        self._kept.move_to_end(trace_id)
+        while len(self._kept) > self.max_held:
+            self._kept.popitem(last=False)
@@ -0,0 +1,97 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from queue import Queue
+
+from skywalking import config
+from skywalking.loggings import logger
+from skywalking.telemetry.drops import DropReporter
+from skywalking.telemetry.metrics import Registry
+from skywalking.utils.buffer import BoundedBuffer
+
+registry = Registry()
+
+segments_encoded = registry.counter('sw_agent_segments_encoded_total', 'segments transformed into their reported form')
+spans_encoded = registry.counter('sw_agent_spans_encoded_total', 'spans transformed into their reported form')
+encode_seconds = registry.histogram('sw_agent_encode_seconds', 'seconds taken to transform a segment')
+reconnects = registry.counter('sw_agent_reconnects_total', 'reconnections to the backend after a failed call')
+report_seconds = {
+    reporter: registry.histogram('sw_agent_report_seconds', 'seconds taken by a call to the backend',
+                                 labels={'reporter': reporter})
+    for reporter in ('segment', 'log', 'snapshot', 'heartbeat')
+}
+
+drops = DropReporter()
+
+exporter = None
+
+
+def register_queue(name: str, queue: Queue):
+    """
+    export the depth of the queue, and its high-water mark and drops when it is a BoundedBuffer
+    """
+    labels = {'queue': name}
+    registry.gauge('sw_agent_queue_depth', queue.qsize, 'items waiting in the queue', labels)
+    if isinstance(queue, BoundedBuffer):
+        registry.gauge('sw_agent_queue_high_water', lambda: queue.high_water,
+                       'the most items that have been waiting in the queue at once', labels)
+        registry.gauge('sw_agent_dropped_total', queue.dropped.get, 'items dropped because the queue was full',
+                       labels, type='counter')
+
+
+def fork_after_in_child():
+    """
+    the locks may have been copied while held by a thread that does not exist in the child, and the drops counted
+    so far are the parent's to report, as is the exporter whose thread is gone, the child serves its own metrics on
+    the first free port after config.telemetry_port
+    """
+    global exporter
+    registry.reset_locks()
+    drops.reset()
+
+    if exporter is not None:
+        exporter.server_close()  # only the inherited copy of the socket, the parent keeps serving on it
+        exporter = None
+        _serve(range(config.telemetry_port + 1, config.telemetry_port + 1 + config.telemetry_child_ports))
+
+
+def init():
+    drops.interval = config.drop_warning_interval
+
+    if exporter or not config.telemetry_port:
+        return
+
+    _serve(range(config.telemetry_port, config.telemetry_port + 1))
+
+
+def _serve(ports: range):
+    global exporter
+    from skywalking.telemetry.exporter import start_exporter
+
+    error = None
+    for port in ports:
+        try:
+            exporter = start_exporter(config.telemetry_host, port)
+        except OSError as exc:
+            error = exc
+            continue
+
+        logger.info(f'exporting the agent metrics on http://{config.telemetry_host}:{port}/metrics')
+        return
+
+    where = f'{ports[0]}-{ports[-1]}' if len(ports) > 1 else f'{ports[0]}'
+    logger.error(f'failed to export the agent metrics on {config.telemetry_host}:{where}: {error}')
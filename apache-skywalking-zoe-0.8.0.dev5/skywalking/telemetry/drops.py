@@ -0,0 +1,74 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import time
+from threading import Lock
+from typing import Callable, Dict
+
+from skywalking.loggings import logger
+
+
+class DropReporter:
+    """
+    Counts the items dropped from each queue, or by the tail sampler, and logs at most one summary of them per
+    interval, so that a saturated queue costs a dict update per dropped item instead of a log call.
+
+    The clock and the log function can be replaced, e.g. with a fake clock in tests.
+    """
+
+    def __init__(self, interval: float = 10, clock: Callable[[], float] = time.monotonic,
+                 log: Callable[..., None] = logger.warning):
+        self.interval = interval  # type: float
+        self.clock = clock
+        self.log = log
+        self.totals = {}  # type: Dict[str, int]
+        self._counts = {}  # type: Dict[str, int]
+        self._last = clock()  # type: float
+        self._lock = Lock()
+
+    def reset(self):
+        self._lock = Lock()
+        self._counts = {}
+        self.totals = {}
+        self._last = self.clock()
+
+    def record(self, queue: str, count: int = 1):
+        with self._lock:
+            self._counts[queue] = self._counts.get(queue, 0) + count
+            self.totals[queue] = self.totals.get(queue, 0) + count
+
+        self.flush()
+
+    def flush(self, force: bool = False):
+        """
+        log the drops counted since the last summary if the interval has passed, called from the drop path and
+        periodically by the reporters so that the last drops of a burst are not held back
+        """
+        now = self.clock()
+        if not force and now - self._last < self.interval:
+            return
+
+        with self._lock:
+            if not force and now - self._last < self.interval:  # another thread flushed meanwhile
+                return
+            counts, self._counts = self._counts, {}
+            elapsed, self._last = now - self._last, now
+
+        if counts:
+            summary = ', '.join(f'{count} {queue}' for queue, count in sorted(counts.items()))
+            self.log('dropped %s item(s) in the last %.0fs because the queues were full or tail sampling left them out',
+                     summary, elapsed)
@@ -0,0 +1,208 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def _format_labels(labels: Dict[str, str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = tuple(labels.items()) + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str = '', labels: Dict[str, str] = None):  # noqa
+        self.name = name
+        self.help = help
+        self.labels = labels or {}  # type: Dict[str, str]
+
+    def samples(self) -> List[Tuple[str, str, object]]:
+        """
+        :return: (name, formatted labels, value) of every sample of this metric
+        """
+        raise NotImplementedError()
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(self, name: str, help: str = '', labels: Dict[str, str] = None):  # noqa
+        super().__init__(name, help, labels)
+        self._value = 0
+        self._lock = Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def samples(self):
+        return [(self.name, _format_labels(self.labels), self.value)]
+
+
+class Gauge(Metric):
+    """
+    reads its value from a callback when collected, so nothing is paid on the hot path
+    """
+    type = 'gauge'
+
+    def __init__(self, name: str, fn: Callable[[], float], help: str = '', labels: Dict[str, str] = None,  # noqa
+                 type: str = 'gauge'):  # noqa
+        super().__init__(name, help, labels)
+        self.fn = fn
+        self.type = type  # a gauge reading a counter kept elsewhere is exported as a counter
+
+    @property
+    def value(self):
+        return self.fn()
+
+    def samples(self):
+        return [(self.name, _format_labels(self.labels), self.value)]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    # seconds
+    DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+
+    def __init__(self, name: str, help: str = '', labels: Dict[str, str] = None,  # noqa
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # the last one is +Inf
+        self._sum = 0.0
+        self._lock = Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        """
+        observe the seconds spent in the with block
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start)
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return sum(self._counts)
+
+    @property
+    def sum(self) -> float:
+        with self._lock:
+            return self._sum
+
+    def samples(self):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+
+        samples, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else _format_value(float(bound))
+            samples.append((f'{self.name}_bucket', _format_labels(self.labels, (('le', le),)), cumulative))
+        samples.append((f'{self.name}_sum', _format_labels(self.labels), total))
+        samples.append((f'{self.name}_count', _format_labels(self.labels), cumulative))
+        return samples
+
+
+class Registry:
+    """
+    the agent's own metrics, a metric registered again under the same name and labels replaces the previous one
+    """
+
+    def __init__(self):
+        self._metrics = {}  # type: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Metric]
+        self._lock = Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            self._metrics[(metric.name, tuple(sorted(metric.labels.items())))] = metric
+        return metric
+
+    def counter(self, name: str, help: str = '', labels: Dict[str, str] = None) -> Counter:  # noqa
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, fn: Callable[[], float], help: str = '', labels: Dict[str, str] = None,  # noqa
+              type: str = 'gauge') -> Gauge:  # noqa
+        return self.register(Gauge(name, fn, help, labels, type))
+
+    def histogram(self, name: str, help: str = '', labels: Dict[str, str] = None) -> Histogram:  # noqa
+        return self.register(Histogram(name, help, labels))
+
+    def reset_locks(self):
+        """
+        replace every lock of the registry and its metrics, only safe while no other thread uses them, e.g. after fork
+        """
+        self._lock = Lock()
+        for metric in self._metrics.values():
+            if hasattr(metric, '_lock'):
+                metric._lock = Lock()
+
+    def get(self, name: str, labels: Dict[str, str] = None) -> Optional[Metric]:
+        with self._lock:
+            return self._metrics.get((name, tuple(sorted((labels or {}).items()))))
+
+    def collect(self) -> Dict[str, object]:
+        """
+        :return: the current value of every sample keyed by its name and labels,
+                 e.g. `sw_agent_queue_depth{queue="segment"}`
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {name + labels: value for metric in metrics for name, labels, value in metric.samples()}
+
+    def prometheus_text(self) -> str:
+        """
+        :return: all metrics in the prometheus text exposition format
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        lines, described = [], set()
+        for metric in metrics:
+            if metric.name not in described:
+                described.add(metric.name)
+                if metric.help:
+                    lines.append(f'# HELP {metric.name} {metric.help}')
+                lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
@@ -15,16 +15,36 @@
 # limitations under the License.
 #
 
+import itertools
+import os
 import uuid
 
-from skywalking.utils.counter import AtomicCounter
+# ids are `{random process prefix}.{sequence}`, like the java agent's GlobalIdGenerator but without the thread id:
+# next() on an itertools.count is atomic, so a single process wide sequence is enough and nothing is locked
+_prefix = uuid.uuid4().hex
+_sequence = itertools.count()
 
-_id = AtomicCounter()
+
+def _reset_after_fork():
+    # a forked child would otherwise generate the exact same ids as its parent
+    global _prefix, _sequence
+    _prefix = uuid.uuid4().hex
+    _sequence = itertools.count()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def new_id() -> str:
+    return f'{_prefix}.{next(_sequence)}'
 
 
 class ID(object):
+    __slots__ = ('value',)
+
     def __init__(self, raw_id: str = None):
-        self.value = raw_id or str(uuid.uuid1()).replace('-', '')
+        self.value = raw_id or new_id()
 
     def __str__(self):
         return self.value
@@ -15,40 +15,38 @@
 # limitations under the License.
 #
 
-from typing import List
+from typing import List, Union
 
-from skywalking import config
-from skywalking.utils.lang import b64encode, b64decode
+from skywalking.trace.correlation import Correlation
+from skywalking.utils.lang import b64encode, b64decode, cached_b64encode, cached_b64decode
 
 
 class CarrierItem(object):
+    __slots__ = ('key', '_val')
+
     def __init__(self, key: str = '', val: str = ''):
         self.key = key  # type: str
         self.val = val  # type: str
 
-    @property
-    def key(self):
-        return self.__key
-
-    @key.setter
-    def key(self, key: str):
-        self.__key = key
-
     @property
     def val(self):
-        return self.__val
+        return self._val
 
     @val.setter
     def val(self, val: str):
-        self.__val = val
+        self._val = val
 
 
 class Carrier(CarrierItem):
+    __slots__ = ('sampled', 'trace_id', 'segment_id', 'span_id', 'service', 'service_instance', 'endpoint',
+                 'client_address', 'correlation_carrier', 'items', '_iter_index')
+
     def __init__(self, trace_id: str = '', segment_id: str = '', span_id: str = '', service: str = '',
                  service_instance: str = '', endpoint: str = '', client_address: str = '',
-                 correlation: dict = None):  # pyre-ignore
+                 correlation: Union[Correlation, dict] = None, sampled: bool = True):  # pyre-ignore
         super(Carrier, self).__init__(key='sw8')
-        self.__val = None
+        self._val = None
+        self.sampled = sampled  # type: bool
         self.trace_id = trace_id  # type: str
         self.segment_id = segment_id  # type: str
         self.span_id = span_id  # type: str
@@ -58,38 +56,39 @@ class Carrier(CarrierItem):
         self.client_address = client_address  # type: str
         self.correlation_carrier = SW8CorrelationCarrier()
         self.items = [self.correlation_carrier, self]  # type: List[CarrierItem]
-        self.__iter_index = 0  # type: int
+        self._iter_index = 0  # type: int
         if correlation is not None:
-            self.correlation_carrier.correlation = correlation
+            self.correlation_carrier.correlation = Correlation.of(correlation)
 
     @property
     def val(self) -> str:
         return '-'.join([
-            '1',
+            '1' if self.sampled else '0',
             b64encode(self.trace_id),
             b64encode(self.segment_id),
             self.span_id,
-            b64encode(self.service),
-            b64encode(self.service_instance),
-            b64encode(self.endpoint),
-            b64encode(self.client_address),
+            cached_b64encode(self.service),
+            cached_b64encode(self.service_instance),
+            cached_b64encode(self.endpoint),
+            cached_b64encode(self.client_address),
         ])
 
     @val.setter
     def val(self, val: str):
-        self.__val = val
+        self._val = val
         if not val:
             return
         parts = val.split('-')
         if len(parts) != 8:
             return
-        self.trace_id = b64decode(parts[1])
-        self.segment_id = b64decode(parts[2])
-        self.span_id = parts[3]
-        self.service = b64decode(parts[4])
-        self.service_instance = b64decode(parts[5])
-        self.endpoint = b64decode(parts[6])
-        self.client_address = b64decode(parts[7])
+        sample, trace_id, segment_id, self.span_id, service, service_instance, endpoint, client_address = parts
+        self.sampled = sample != '0'
+        self.trace_id = b64decode(trace_id)
+        self.segment_id = b64decode(segment_id)
+        self.service = cached_b64decode(service)
+        self.service_instance = cached_b64decode(service_instance)
+        self.endpoint = cached_b64decode(endpoint)
+        self.client_address = cached_b64decode(client_address)
 
     @property
     def is_valid(self):
@@ -104,44 +103,34 @@ class Carrier(CarrierItem):
 
     @property
     def is_suppressed(self):  # if is invalid from previous set, ignored or suppressed status propagation downstream
-        return self.__val and not self.is_valid
+        return self._val and (not self.is_valid or not self.sampled)
 
     def __iter__(self):
-        self.__iter_index = 0
+        self._iter_index = 0
         return self
 
     def __next__(self):
-        if self.__iter_index >= len(self.items):
+        if self._iter_index >= len(self.items):
             raise StopIteration
-        n = self.items[self.__iter_index]
-        self.__iter_index += 1
+        n = self.items[self._iter_index]
+        self._iter_index += 1
         return n
 
 
 class SW8CorrelationCarrier(CarrierItem):
+    __slots__ = ('correlation',)
+
     def __init__(self):
         super(SW8CorrelationCarrier, self).__init__(key='sw8-correlation')
-        self.correlation = {}  # type: dict
+        self.correlation = Correlation.EMPTY  # type: Correlation
 
     @property
     def val(self) -> str:
-        if self.correlation is None or len(self.correlation) == 0:
-            return ''
-
-        return ','.join([
-            f'{b64encode(k)}:{b64encode(v)}'
-            for k, v in self.correlation.items()
-        ])
+        return self.correlation.encode()
 
     @val.setter
     def val(self, val: str):
-        self.__val = val
+        self._val = val
         if not val:
             return
-        for per in val.split(','):
-            if len(self.correlation) > config.correlation_element_max_number:
-                break
-            parts = per.split(':')
-            if len(parts) != 2:
-                continue
-            self.correlation[b64decode(parts[0])] = b64decode(parts[1])
+        self.correlation = Correlation.decode(val)
@@ -16,49 +16,47 @@
 #
 
 from skywalking import Component, agent, config
+from skywalking import endpoint
 from skywalking import profile
+from skywalking import sampling
 from skywalking.agent import isfull
 from skywalking.profile.profile_status import ProfileStatusReference
 from skywalking.trace import ID
 from skywalking.trace.carrier import Carrier
+from skywalking.trace.correlation import Correlation
 from skywalking.trace.segment import Segment, SegmentRef
 from skywalking.trace.snapshot import Snapshot
 from skywalking.trace.span import Span, Kind, NoopSpan, EntrySpan, ExitSpan
 from skywalking.utils.counter import Counter
 from skywalking.utils.time import current_milli_time
 
-try:  # attempt to use async-local instead of thread-local context and spans
-    import contextvars
-
-    __spans = contextvars.ContextVar('spans')
-    _spans = __spans.get
-    _spans_set = __spans.set  # pyre-ignore
-
-    def _spans():  # need to do this because can't set mutable default = [] in contextvars.ContextVar()
-        spans = __spans.get(None)
 
-        if spans is not None:
-            return spans
+class _Frame(object):
+    """
+    one entry of the span stack, frames are never changed once pushed so that a stack can be shared by the asyncio
+    tasks that copied the context, push and pop only ever set the top frame
+    """
+    __slots__ = ('span', 'below', 'root')
 
-        spans = []
-        __spans.set(spans)
+    def __init__(self, span: Span, below: '_Frame' = None):
+        self.span = span  # type: Span
+        self.below = below  # type: _Frame
+        self.root = below.root if below is not None else span  # type: Span
 
-        return spans
 
-    def _spans_dup():
-        spans = __spans.get()[:]
-        __spans.set(spans)
-
-        return spans
+try:  # attempt to use async-local instead of thread-local context and spans
+    import contextvars
 
-    __spans.set([])
+    __spans = contextvars.ContextVar('spans', default=None)
+    _spans = __spans.get  # the top frame of the span stack, None when it is empty
+    _spans_set = __spans.set  # pyre-ignore
 
 except ImportError:
     import threading
 
     class SwLocal(threading.local):
         def __init__(self):
-            self.spans = []
+            self.spans = None
 
     __local = SwLocal()
 
@@ -68,21 +66,62 @@ except ImportError:
     def _spans_set(spans):
         __local.spans = spans
 
-    _spans_dup = _spans
+
+def _push(span: Span):
+    _spans_set(_Frame(span, _spans()))
+
+
+def _pop(span: Span) -> _Frame:
+    """
+    remove `span` from the span stack and return the new top, spans stopped out of order have the frames above them
+    rebuilt rather than changed
+    """
+    top = _spans()
+    if top is not None and top.span is span:
+        _spans_set(top.below)
+        return top.below
+
+    above = []
+    frame = top
+    while frame is not None and frame.span is not span:
+        above.append(frame.span)
+        frame = frame.below
+
+    if frame is None:  # not on this stack
+        return top
+
+    frame = frame.below
+    for s in reversed(above):
+        frame = _Frame(s, frame)
+    _spans_set(frame)
+    return frame
 
 
 class SpanContext(object):
     def __init__(self):
-        self.segment = Segment()  # type: Segment
+        self._segment = None  # type: Segment
         self._sid = Counter()
-        self._correlation = {}  # type: dict
+        self._correlation = Correlation.EMPTY  # type: Correlation
         self._nspans = 0
         self.profile_status = None  # type: ProfileStatusReference
         self.create_time = current_milli_time()
 
+    @property
+    def segment(self) -> Segment:
+        # created on first use so contexts which only ever hand out noop spans never generate an id
+        if self._segment is None:
+            self._segment = Segment()
+        return self._segment
+
     def ignore_check(self, op: str, kind: Kind, carrier: 'Carrier' = None):
-        if config.RE_IGNORE_PATH.match(op) or isfull() or (carrier is not None and carrier.is_suppressed):
-            return NoopSpan(context=NoopContext())
+        if isfull() or (carrier is not None and carrier.is_suppressed):
+            return noop_span
+
+        # the sampling decision is made once at the root of the trace, a valid carrier means upstream sampled it,
+        # local roots are left alone as they may be continued from a sampled snapshot in another thread
+        if self._nspans == 0 and not kind.is_local and not (carrier is not None and carrier.is_valid) \
+                and not sampling.sampler.try_sampling(op):
+            return noop_span
 
         return None
 
@@ -116,18 +155,25 @@ class SpanContext(object):
         if span is not None:
             return span
 
-        spans = _spans()
-        parent = spans[-1] if spans else None  # type: Span
+        top = _spans()
+        parent = top.span if top else None  # type: Span
 
         return self.new_span(parent, Span, op=op, kind=Kind.Local)
 
     def new_entry_span(self, op: str, carrier: 'Carrier' = None, inherit: Component = None) -> Span:
+        # only endpoints are matched against the ignored paths, exit and local ops are statements, commands, hosts
+        if config.IGNORE_PATH.match(op):
+            return noop_span
+
+        # sampling limits, profiling tasks and the backend all see the grouped name, never the raw url
+        op = endpoint.grouper.group(op)
+
         span = self.ignore_check(op, Kind.Entry, carrier)
         if span is not None:
             return span
 
-        spans = _spans()
-        parent = spans[-1] if spans else None  # type: Span
+        top = _spans()
+        parent = top.span if top else None  # type: Span
 
         # start profiling if profile_context is set
         if self.profile_status is None:
@@ -156,8 +202,8 @@ class SpanContext(object):
         if span is not None:
             return span
 
-        spans = _spans()
-        parent = spans[-1] if spans else None  # type: Span
+        top = _spans()
+        parent = top.span if top else None  # type: Span
 
         if parent is not None and parent.kind.is_exit and component == parent.inherit:
             span = parent
@@ -181,18 +227,11 @@ class SpanContext(object):
 
     def start(self, span: Span):
         self._nspans += 1
-        spans = _spans_dup()
-        if span not in spans:
-            spans.append(span)
+        _push(span)
 
     def stop(self, span: Span) -> bool:
-        spans = _spans_dup()
         span.finish(self.segment)
-
-        try:
-            spans.remove(span)
-        except Exception:
-            pass
+        _pop(span)
 
         self._nspans -= 1
         if self._nspans == 0:
@@ -202,40 +241,29 @@ class SpanContext(object):
         return False
 
     def active_span(self):
-        spans = _spans()
-        if spans:
-            return spans[len(spans) - 1]
+        top = _spans()
+        if top:
+            return top.span
 
         return None
 
     def get_correlation(self, key):
-        if key in self._correlation:
-            return self._correlation[key]
-        return None
+        return self._correlation.get(key)
 
     def put_correlation(self, key, value):
-        if key is None:
-            return
-        if value is None:
-            self._correlation.pop(key, value)
-            return
-        if len(value) > config.correlation_value_max_length:
-            return
-        if len(self._correlation) > config.correlation_element_max_number:
-            return
-
-        self._correlation[key] = value
+        # copy on write, carriers and snapshots taken earlier keep the map they were given
+        self._correlation = self._correlation.put(key, value)
 
     def capture(self):
-        spans = _spans()
-        if len(spans) == 0:
+        top = _spans()
+        if top is None:
             return None
 
         return Snapshot(
             segment_id=str(self.segment.segment_id),
-            span_id=self.active_span().sid,
+            span_id=top.span.sid,
             trace_id=self.segment.related_traces[0],
-            endpoint=spans[0].op,
+            endpoint=top.root.op,
             correlation=self._correlation,
         )
 
@@ -247,33 +275,35 @@ class SpanContext(object):
             span = self.active_span()
             span.refs.append(ref)
             self.segment.relate(ID(ref.trace_id))
-            self._correlation.update(snapshot.correlation)
+            self._correlation = self._correlation.merge(snapshot.correlation)
 
 
 class NoopContext(SpanContext):
+    """
+    holds no per-request state, so a single instance is shared by every ignored, unsampled or disabled call
+    """
+
     def __init__(self):
         super().__init__()
 
     def new_local_span(self, op: str) -> Span:
-        return NoopSpan(self)
+        return noop_span
 
     def new_entry_span(self, op: str, carrier: 'Carrier' = None, inherit: Component = None) -> Span:
-        return NoopSpan(self)
+        return noop_span
 
     def new_exit_span(self, op: str, peer: str, component: Component = None, inherit: Component = None) -> Span:
-        return NoopSpan(self)
+        return noop_span
 
-    def stop(self, span: Span) -> bool:
-        spans = _spans_dup()
-
-        try:
-            spans.remove(span)
-        except Exception:
-            pass
+    def start(self, span: Span):
+        # the shared span is pushed once per start, so nested and concurrent uses each pop their own entry
+        _push(span)
 
-        self._nspans -= 1
+    def stop(self, span: Span) -> bool:
+        return _pop(span) is None
 
-        return self._nspans == 0
+    def put_correlation(self, key, value):
+        return
 
     def capture(self):
         return Snapshot(
@@ -285,13 +315,20 @@ class NoopContext(SpanContext):
         )
 
     def continued(self, snapshot: 'Snapshot'):
-        self._correlation.update(snapshot.correlation)
+        return
+
+
+noop_context = NoopContext()
+noop_span = NoopSpan(noop_context)
 
 
 def get_context() -> SpanContext:
-    spans = _spans()
+    top = _spans()
+
+    if top:
+        return top.span.context
 
-    if spans:
-        return spans[len(spans) - 1].context
+    if not config.tracing_enabled:
+        return noop_context
 
     return SpanContext()
@@ -0,0 +1,117 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import Optional, Tuple, Union
+
+from skywalking import config
+from skywalking.utils.lang import cached_b64encode, cached_b64decode
+
+
+class Correlation:
+    """
+    An immutable correlation map, every change returns a new map so contexts, carriers and snapshots can share one
+    without copying it.
+
+    The few entries are kept as a tuple of pairs, the sw8-correlation header is encoded once and cached with the map.
+    """
+    __slots__ = ('_items', '_header')
+
+    EMPTY = None  # type: Correlation
+
+    def __init__(self, items: Union[dict, Tuple[Tuple[str, str], ...]] = (), header: str = None):
+        self._items = tuple(items.items()) if isinstance(items, dict) else items  # type: Tuple[Tuple[str, str], ...]
+        self._header = header  # type: Optional[str]
+
+    @staticmethod
+    def of(correlation: Union['Correlation', dict, None]) -> 'Correlation':
+        if correlation is None:
+            return Correlation.EMPTY
+        if isinstance(correlation, Correlation):
+            return correlation
+        return Correlation(correlation)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __repr__(self):
+        return f'Correlation({dict(self._items)})'
+
+    def get(self, key: str) -> Optional[str]:
+        for k, v in self._items:
+            if k == key:
+                return v
+        return None
+
+    def put(self, key: str, value: Optional[str]) -> 'Correlation':
+        """
+        the map with `key` set to `value`, or removed when `value` is None, the map itself when the entry is over the
+        configured limits
+        """
+        if key is None:
+            return self
+
+        items = tuple((k, v) for k, v in self._items if k != key)
+        if value is None:
+            return self if len(items) == len(self._items) else Correlation(items)
+        if len(value) > config.correlation_value_max_length:
+            return self
+        if len(items) >= config.correlation_element_max_number:
+            return self
+
+        return Correlation(items + ((key, value),))
+
+    def merge(self, other: 'Correlation') -> 'Correlation':
+        if not other._items:
+            return self
+        if not self._items:
+            return other
+
+        merged = self
+        for key, value in other._items:
+            merged = merged.put(key, value)
+        return merged
+
+    def encode(self) -> str:
+        header = self._header
+        if header is None:
+            header = self._header = ','.join(f'{cached_b64encode(k)}:{cached_b64encode(v)}' for k, v in self._items)
+        return header
+
+    @staticmethod
+    def decode(header: str) -> 'Correlation':
+        """
+        the map in a sw8-correlation header, entries over the configured limits are left out
+        """
+        if not header:
+            return Correlation.EMPTY
+
+        correlation = Correlation.EMPTY
+        pers = header.split(',')
+        for per in pers:
+            parts = per.split(':')
+            if len(parts) == 2:
+                correlation = correlation.put(cached_b64decode(parts[0]), cached_b64decode(parts[1]))
+
+        if correlation._items and len(correlation) == len(pers):  # nothing left out, forward the header as it came
+            correlation._header = header
+        return correlation
+
+
+Correlation.EMPTY = Correlation((), '')
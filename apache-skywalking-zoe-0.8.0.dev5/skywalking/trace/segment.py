@@ -18,7 +18,8 @@
 import time
 from typing import List, TYPE_CHECKING
 
-from skywalking import config
+from skywalking import config, telemetry
+from skywalking.protocol.language_agent.Tracing_pb2 import SegmentObject
 from skywalking.trace import ID
 from skywalking.utils.lang import tostring
 
@@ -29,6 +30,9 @@ if TYPE_CHECKING:
 
 
 class SegmentRef(object):
+    __slots__ = ('ref_type', 'trace_id', 'segment_id', 'span_id', 'service', 'service_instance', 'endpoint',
+                 'client_address')
+
     def __init__(self, carrier: 'Carrier', ref_type: str = 'CrossProcess'):
         self.ref_type = ref_type  # type: str
         self.trace_id = carrier.trace_id  # type: str
@@ -65,11 +69,13 @@ class SegmentRef(object):
 
 
 class _NewID(ID):
-    pass
+    __slots__ = ()
 
 
 @tostring
 class Segment(object):
+    __slots__ = ('segment_id', 'spans', 'timestamp', 'related_traces')
+
     def __init__(self):
         self.segment_id = ID()  # type: ID
         self.spans = []  # type: List[Span]
@@ -83,3 +89,29 @@ class Segment(object):
         if isinstance(self.related_traces[0], _NewID):
             del self.related_traces[-1]
         self.related_traces.append(trace_id)
+
+    def transform(self) -> SegmentObject:
+        with telemetry.encode_seconds.time():
+            segment = SegmentObject(
+                traceId=str(self.related_traces[0]),
+                traceSegmentId=str(self.segment_id),
+                service=config.service_name,
+                serviceInstance=config.service_instance,
+                spans=[span.transform() for span in self.spans],
+            )
+        telemetry.segments_encoded.inc()
+        telemetry.spans_encoded.inc(len(self.spans))
+        return segment
+
+
+class SpilledSegment(object):
+    """
+    a segment read back from the spill files, kept in the form it is reported in
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes):
+        self.data = data  # type: bytes
+
+    def transform(self) -> SegmentObject:
+        return SegmentObject.FromString(self.data)
@@ -20,6 +20,7 @@ if TYPE_CHECKING:
     from skywalking.trace.context import SpanContext
 
 from skywalking.trace import ID
+from skywalking.trace.correlation import Correlation
 
 
 class Snapshot:
@@ -29,13 +30,13 @@ class Snapshot:
             span_id: int = None,
             trace_id: ID = None,
             endpoint: str = None,
-            correlation: dict = None
+            correlation: Correlation = None
     ):
         self.trace_id = trace_id  # type: ID
         self.segment_id = segment_id  # type: str
         self.span_id = span_id  # type: int
         self.endpoint = endpoint  # type: str
-        self.correlation = correlation.copy()  # type: dict
+        self.correlation = Correlation.of(correlation)  # type: Correlation
 
     def is_from_current(self, context: 'SpanContext'):
         return self.segment_id is not None and self.segment_id == context.capture().segment_id
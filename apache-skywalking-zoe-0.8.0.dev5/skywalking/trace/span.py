@@ -16,11 +16,12 @@
 #
 
 import time
-from collections import defaultdict
-from typing import List, Union, DefaultDict
+from typing import List, Union, Dict
 from typing import TYPE_CHECKING
 
 from skywalking import Kind, Layer, Log, Component, LogItem, config
+from skywalking.protocol.common.Common_pb2 import KeyStringValuePair
+from skywalking.protocol.language_agent.Tracing_pb2 import SpanObject, Log as LogObject, SegmentReference
 from skywalking.trace import ID
 from skywalking.trace.carrier import Carrier
 from skywalking.trace.segment import SegmentRef, Segment
@@ -33,6 +34,10 @@ if TYPE_CHECKING:
 
 @tostring
 class Span:
+    # slots keep spans compact, tags, logs and refs are only allocated once something is added to them
+    __slots__ = ('_depth', 'context', 'sid', 'pid', 'op', 'peer', 'kind', 'component', 'layer', 'inherit',
+                 '_tags', '_logs', '_refs', 'start_time', 'end_time', 'error_occurred')
+
     def __init__(
             self,
             context: 'SpanContext',
@@ -55,13 +60,43 @@ class Span:
         self.layer = layer or Layer.Unknown  # type: Layer
         self.inherit = Component.Unknown  # type: Component
 
-        self.tags = defaultdict(list)  # type: DefaultDict[str, Union[Tag, List[Tag]]]
-        self.logs = []  # type: List[Log]
-        self.refs = []  # type: List[SegmentRef]
+        self._tags = None  # type: Dict[str, Union[Tag, List[Tag]]]
+        self._logs = None  # type: List[Log]
+        self._refs = None  # type: List[SegmentRef]
         self.start_time = 0  # type: int
         self.end_time = 0  # type: int
         self.error_occurred = False  # type: bool
 
+    @property
+    def tags(self) -> Dict[str, Union[Tag, List[Tag]]]:
+        if self._tags is None:
+            self._tags = {}
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags: Dict[str, Union[Tag, List[Tag]]]):
+        self._tags = tags
+
+    @property
+    def logs(self) -> List[Log]:
+        if self._logs is None:
+            self._logs = []
+        return self._logs
+
+    @logs.setter
+    def logs(self, logs: List[Log]):
+        self._logs = logs
+
+    @property
+    def refs(self) -> List[SegmentRef]:
+        if self._refs is None:
+            self._refs = []
+        return self._refs
+
+    @refs.setter
+    def refs(self, refs: List[SegmentRef]):
+        self._refs = refs
+
     def start(self):
         self._depth += 1
         if self._depth != 1:
@@ -99,17 +134,52 @@ class Span:
         if tag.overridable:
             self.tags[tag.key] = tag
         else:
-            self.tags[tag.key].append(tag)
+            self.tags.setdefault(tag.key, []).append(tag)
 
         return self
 
     def iter_tags(self):
-        for tag in self.tags.values():
+        if not self._tags:
+            return
+
+        for tag in self._tags.values():
             if isinstance(tag, Tag):
                 yield tag
             else:
                 yield from tag
 
+    def transform(self) -> SpanObject:
+        return SpanObject(
+            spanId=self.sid,
+            parentSpanId=self.pid,
+            startTime=self.start_time,
+            endTime=self.end_time,
+            operationName=self.op,
+            peer=self.peer,
+            spanType=self.kind.name,
+            spanLayer=self.layer.name,
+            componentId=self.component.value,
+            isError=self.error_occurred,
+            logs=[LogObject(
+                time=int(log.timestamp * 1000),
+                data=[KeyStringValuePair(key=item.key, value=item.val) for item in log.items],
+            ) for log in self._logs or ()],
+            tags=[KeyStringValuePair(
+                key=tag.key,
+                value=str(tag.val),
+            ) for tag in self.iter_tags()],
+            refs=[SegmentReference(
+                refType=0 if ref.ref_type == 'CrossProcess' else 1,
+                traceId=ref.trace_id,
+                parentTraceSegmentId=ref.segment_id,
+                parentSpanId=ref.span_id,
+                parentService=ref.service,
+                parentServiceInstance=ref.service_instance,
+                parentEndpoint=ref.endpoint,
+                networkAddressUsedAtPeer=ref.client_address,
+            ) for ref in self._refs or () if ref.trace_id],
+        )
+
     def inject(self) -> 'Carrier':
         raise RuntimeWarning(
             'can only inject context carrier into ExitSpan, this may be a potential bug in the agent, '
@@ -128,7 +198,7 @@ class Span:
 
         ref = SegmentRef(carrier=carrier)
 
-        if ref not in self.refs:
+        if self._refs is None or ref not in self._refs:
             self.refs.append(ref)
 
         return self
@@ -148,6 +218,8 @@ class Span:
 
 @tostring
 class EntrySpan(Span):
+    __slots__ = ('_max_depth',)
+
     def __init__(
             self,
             context: 'SpanContext',
@@ -176,12 +248,14 @@ class EntrySpan(Span):
         self._max_depth = self._depth
         self.component = 0
         self.layer = Layer.Unknown
-        self.logs = []
-        self.tags = defaultdict(list)
+        self._logs = None
+        self._tags = None
 
 
 @tostring
 class ExitSpan(Span):
+    __slots__ = ()
+
     def __init__(
             self,
             context: 'SpanContext',
@@ -219,11 +293,71 @@ class ExitSpan(Span):
 
 @tostring
 class NoopSpan(Span):
+    __slots__ = ()
+
     def __init__(self, context: 'SpanContext' = None):
         Span.__init__(self, context=context, op='', kind=Kind.Local)
 
+    # a single instance is shared across requests and threads, so it keeps no depth, tags, logs or attributes of its
+    # own, setting them is ignored
+    @property
+    def op(self) -> str:
+        return ''
+
+    @op.setter
+    def op(self, op: str):
+        pass
+
+    @property
+    def peer(self) -> str:
+        return None
+
+    @peer.setter
+    def peer(self, peer: str):
+        pass
+
+    @property
+    def component(self) -> Component:
+        return Component.Unknown
+
+    @component.setter
+    def component(self, component: Component):
+        pass
+
+    @property
+    def layer(self) -> Layer:
+        return Layer.Unknown
+
+    @layer.setter
+    def layer(self, layer: Layer):
+        pass
+
+    @property
+    def error_occurred(self) -> bool:
+        return False
+
+    @error_occurred.setter
+    def error_occurred(self, error_occurred: bool):
+        pass
+
+    def start(self):
+        self.context.start(self)
+
+    def stop(self):
+        return self.context.stop(self)
+
+    def raised(self) -> 'Span':
+        return self
+
+    def log(self, ex: Exception) -> 'Span':
+        return self
+
+    def tag(self, tag: Tag) -> 'Span':
+        return self
+
     def extract(self, carrier: 'Carrier'):
         return
 
     def inject(self) -> 'Carrier':
-        return Carrier()
+        # tell downstream services this trace is not sampled, so they don't start tracing it on their own
+        return Carrier(sampled=False)
@@ -0,0 +1,116 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import time
+from collections import deque
+from queue import Full, Empty
+from threading import Event
+
+from skywalking.utils.integer import AtomicInteger
+
+
+class BoundedBuffer:
+    """
+    A bounded multi-producer single-consumer buffer with the subset of the queue.Queue api used by the reporters.
+
+    Producers never take a lock: deque.append and deque.popleft are atomic, the consumer is only woken up through
+    an Event when it is actually waiting. The size check is not atomic with the append, so concurrent producers
+    may overshoot maxsize by at most one item each.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self.dropped = AtomicInteger(var=0)
+        self.high_water = 0  # the most items held at once, updated without a lock so it may miss concurrent puts
+        self._items = deque()
+        self._not_empty = Event()
+        self._waiting = False
+        self._paused = False
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self._items)
+
+    def put(self, item, block: bool = False, timeout: float = None):  # noqa
+        """
+        never blocks, the arguments are only kept for compatibility with queue.Queue
+        :raise Full: when the buffer is full, the item is counted as dropped
+        """
+        if 0 < self.maxsize <= len(self._items):
+            self.dropped.add_and_get(1)
+            raise Full
+
+        self._items.append(item)
+        size = len(self._items)
+        if size > self.high_water:
+            self.high_water = size
+        if self._waiting:
+            self._not_empty.set()
+
+    def put_nowait(self, item):
+        self.put(item)
+
+    def get(self, block: bool = True, timeout: float = None):
+        deadline = None if timeout is None else time.time() + timeout
+
+        while True:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                pass
+
+            remaining = None if deadline is None else deadline - time.time()
+            if not block or self._paused or (remaining is not None and remaining <= 0):
+                raise Empty
+
+            self._not_empty.clear()
+            self._waiting = True
+            try:
+                # recheck, a producer may have appended or pause may have been called before seeing _waiting
+                if not self._items and not self._paused:
+                    self._not_empty.wait(remaining)
+            finally:
+                self._waiting = False
+
+    def pause(self):
+        """
+        make blocking gets give up right away until resume is called, waking up the consumer if it is waiting
+        """
+        self._paused = True
+        self._not_empty.set()
+
+    def resume(self):
+        self._paused = False
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def task_done(self):
+        # items are handed over to the reporter as soon as they are taken, nothing to track
+        pass
+
+    def join(self, interval: float = 0.01):
+        """
+        wait until the consumer has taken every item out of the buffer
+        """
+        while self._items:
+            time.sleep(interval)
@@ -15,19 +15,44 @@
 # limitations under the License.
 #
 
-import base64
+import binascii
+from functools import lru_cache
 
 
 def tostring(cls):
     def __str__(self): # noqa
-        return f"{type(self).__name__}@{id(self)}[{', '.join(f'{k}={str(v)}' for (k, v) in vars(self).items())}]"
+        return f"{type(self).__name__}@{id(self)}[{', '.join(f'{k}={str(v)}' for (k, v) in fields(self))}]"
     cls.__str__ = __str__
     return cls
 
 
+def fields(obj):
+    """
+    iterate over the attributes of an object, including those stored in __slots__
+    """
+    if hasattr(obj, '__dict__'):
+        yield from vars(obj).items()
+
+    for klass in type(obj).__mro__:
+        for name in getattr(klass, '__slots__', ()):
+            if hasattr(obj, name):
+                yield name, getattr(obj, name)
+
+
 def b64encode(s: str = '') -> str:
-    return base64.b64encode(s.encode('utf8')).decode('utf8')
+    return binascii.b2a_base64(s.encode('utf8'), newline=False).decode('ascii')
 
 
 def b64decode(s: str = '') -> str:
-    return base64.b64decode(s).decode('utf8')
+    return binascii.a2b_base64(s).decode('utf8')
+
+
+# values that repeat across requests (service, instance, endpoint, peer) are cached, unique ids should not use these
+@lru_cache(maxsize=1024)
+def cached_b64encode(s: str = '') -> str:
+    return b64encode(s)
+
+
+@lru_cache(maxsize=1024)
+def cached_b64decode(s: str = '') -> str:
+    return b64decode(s)
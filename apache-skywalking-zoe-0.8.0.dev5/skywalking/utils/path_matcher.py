@@ -0,0 +1,113 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import re
+from functools import lru_cache
+from typing import List, Pattern
+
+_reesc = re.compile(r'([.*+?^=!:${}()|\[\]\\])')
+
+
+def translate(pattern: str) -> str:
+    """
+    the regex for one ignore path pattern, "?" is one character, "*" is anything within a segment, "**" is any
+    number of segments
+    """
+    return '/(?:[^/]*/)*'.join(  # replaces "/**/"
+        '(?:(?:[^/]+/)*[^/]+)?'.join(  # replaces "**"
+            '[^/]*'.join(  # replaces "*"
+                '[^/]'.join(  # replaces "?"
+                    _reesc.sub(r'\\\1', s) for s in p3.split('?')
+                ) for p3 in p2.split('*')
+            ) for p2 in p1.strip().split('**')
+        ) for p1 in pattern.split('/**/')
+    )
+
+
+class _Node:
+    __slots__ = ('children', 'patterns')
+
+    def __init__(self):
+        self.children = {}
+        self.patterns = []  # type: List[Pattern]
+
+
+class PathMatcher:
+    """
+    Decides whether an endpoint is ignored, equivalent to one alternation regex of all the suffixes and path patterns
+    but without trying every alternative on every call.
+
+    Suffixes are looked up by the extension of the op, patterns without wildcards are looked up in a set and the
+    others are kept in a trie keyed by their literal leading segments, so only the few patterns sharing a prefix with
+    the op are ever run. Decisions are memoized in a bounded lru cache.
+
+    An empty pattern matches the empty op, as in the regex, an empty suffix is skipped where the regex matched every op
+    with it.
+    """
+
+    def __init__(self, paths: str, suffixes: str, cache_size: int = 1024):
+        self._extensions = set()
+        self._suffixes = []
+        for suffix in suffixes.split(','):
+            suffix = suffix.strip()
+            if not suffix:
+                continue
+            if suffix.rfind('.') == 0:
+                self._extensions.add(suffix)
+            else:
+                self._suffixes.append(suffix)
+
+        self._exact = set()
+        self._root = _Node()
+        for path in paths.split(','):
+            path = '/**/'.join(p.strip() for p in path.split('/**/'))  # same stripping as translate
+            if '*' not in path and '?' not in path:
+                self._exact.add(path)
+                continue
+
+            node = self._root
+            for segment in path.split('/'):
+                if '*' in segment or '?' in segment:
+                    break
+                node = node.children.setdefault(segment, _Node())
+            node.patterns.append(re.compile(translate(path)))
+
+        self.match = lru_cache(maxsize=cache_size)(self._match) if cache_size > 0 else self._match
+
+    def _match(self, op: str) -> bool:
+        dot = op.rfind('.')
+        if dot > 0 and op[dot:] in self._extensions:
+            return True
+        for suffix in self._suffixes:
+            if len(op) > len(suffix) and op.endswith(suffix):
+                return True
+
+        if op in self._exact:
+            return True
+
+        node = self._root
+        if not node.children and not node.patterns:
+            return False
+        for segment in op.split('/'):
+            for pattern in node.patterns:
+                if pattern.fullmatch(op):
+                    return True
+            node = node.children.get(segment)
+            if node is None:
+                return False
+
+        return any(pattern.fullmatch(op) for pattern in node.patterns)
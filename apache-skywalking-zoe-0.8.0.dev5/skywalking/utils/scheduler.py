@@ -0,0 +1,259 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+from skywalking.loggings import logger
+
+_EPSILON = 1e-6  # of a tick, so that float rounding never puts a deadline in the tick after the one it falls on
+
+
+class Timer:
+    """
+    a call scheduled on a `Scheduler`, repeating every `period` seconds when it is set
+    """
+    __slots__ = ('deadline', 'func', 'args', 'period', 'blocking', 'rounds', 'cancelled')
+
+    def __init__(self, deadline: float, func: Callable, args: tuple, period: Optional[float], blocking: bool):
+        self.deadline = deadline  # type: float
+        self.func = func  # type: Callable
+        self.args = args  # type: tuple
+        self.period = period  # type: Optional[float]
+        self.blocking = blocking  # type: bool
+        self.rounds = 0  # turns of the wheel left before the timer is due
+        self.cancelled = False
+
+    def cancel(self):
+        # dropped from the wheel the next time its slot comes up
+        self.cancelled = True
+
+
+class Scheduler:
+    """
+    Runs the timed calls of the agent, profile task starts and stops, profile dumps and the reporter loops, on one
+    thread instead of a thread per call.
+
+    Timers are kept in a hashed timer wheel of `slots` slots, `tick` seconds each, so scheduling and cancelling never
+    scan or sort the pending timers. The thread only wakes up for slots holding timers. Calls taking a lock or
+    returning at once run on the wheel thread, calls which may block on the network are marked `blocking` and run
+    one at a time on a worker thread, so they never delay the others.
+
+    The clock is pluggable and `advance` runs everything due at a given time, the wheel can be driven by a virtual
+    clock without starting any thread.
+    """
+
+    def __init__(self, tick: float = 0.005, slots: int = 1024, clock: Callable[[], float] = time.monotonic,
+                 name: str = 'SchedulerThread'):
+        self.tick = tick  # type: float
+        self.clock = clock
+        self.name = name  # type: str
+
+        self._wheel = [[] for _ in range(slots)]  # type: List[List[Timer]]
+        self._origin = clock()  # type: float
+        self._ticks = 0  # the last tick run, ticks are counted from the origin
+        self._wake = None  # type: Optional[int]
+        self._count = 0  # timers in the wheel, cancelled ones included
+        self._blocked = deque()  # type: Deque[Timer]
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stopped = True
+        self._generation = 0  # of the threads, those of a previous start leave once they see it changed
+        self._thread = None  # type: Optional[threading.Thread]
+        self._worker = None  # type: Optional[threading.Thread]
+
+    def schedule(self, delay: float, func: Callable, *args, period: float = None, blocking: bool = False) -> Timer:
+        """
+        call `func(*args)` in `delay` seconds, then every `period` seconds when it is set, a repeating call can return
+        the seconds until its next call instead, to back off on errors for example
+        """
+        timer = Timer(self.clock() + max(delay, 0), func, args, period, blocking)
+        with self._lock:
+            self._add(timer)
+        return timer
+
+    def advance(self, now: float = None):
+        """
+        run the timers due at `now`, the current time of the clock by default, blocking timers are handed to the
+        worker thread when it runs, and are run here otherwise
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            due = self._expire(math.floor((now - self._origin) / self.tick + _EPSILON))
+            if self._worker is not None:
+                self._blocked.extend(timer for timer in due if timer.blocking)
+                due = [timer for timer in due if not timer.blocking]
+                self._changed.notify_all()
+
+        for timer in due:
+            self._run(timer, now)
+
+    def start(self):
+        with self._lock:
+            if not self._stopped:
+                return
+            self._stopped = False
+            # threads which did not stop in time are still inside a call, they leave once it returns
+            self._generation += 1
+            generation = self._generation
+
+        self._thread = threading.Thread(name=self.name, target=self._loop, args=(generation,), daemon=True)
+        self._worker = threading.Thread(name=f'{self.name}Worker', target=self._work, args=(generation,),
+                                        daemon=True)
+        self._thread.start()
+        self._worker.start()
+
+    def stop(self, timeout: float = None):
+        """
+        stop the threads, waiting up to `timeout` seconds for the calls they are running, the timers are kept and run
+        once the scheduler is started again
+        """
+        with self._lock:
+            self._stopped = True
+            self._changed.notify_all()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in (self._thread, self._worker):
+            if thread is not None:
+                thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+                if thread.is_alive():
+                    logger.warning(f'{thread.name} did not stop in time')
+
+        with self._lock:
+            self._worker = None
+
+    def fork_after_in_child(self):
+        # the threads are gone, the lock may have been copied while held and the timers are the parent's
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._wheel = [[] for _ in self._wheel]
+        self._origin, self._ticks, self._wake, self._count = self.clock(), 0, None, 0
+        self._blocked.clear()
+        self._stopped = True
+        self._thread = self._worker = None
+
+    def _add(self, timer: Timer):
+        target = max(math.ceil((timer.deadline - self._origin) / self.tick - _EPSILON), self._ticks + 1)
+        timer.rounds = (target - self._ticks - 1) // len(self._wheel)
+        self._wheel[target % len(self._wheel)].append(timer)
+        self._count += 1
+
+        if self._wake is None or target < self._wake:
+            self._changed.notify_all()
+
+    def _expire(self, ticks: int) -> List[Timer]:
+        """
+        take the timers due up to `ticks` out of the wheel, every slot is visited once however many turns were missed
+        """
+        slots = len(self._wheel)
+        due = []
+        for t in range(self._ticks + 1, min(ticks, self._ticks + slots) + 1):
+            slot = self._wheel[t % slots]
+            if not slot:
+                continue
+
+            turns = (ticks - t) // slots + 1  # times the slot came up since the last run
+            kept = []
+            for timer in slot:
+                if timer.cancelled or timer.rounds < turns:
+                    self._count -= 1
+                    if not timer.cancelled:
+                        due.append(timer)
+                else:
+                    timer.rounds -= turns
+                    kept.append(timer)
+            self._wheel[t % slots] = kept
+
+        self._ticks = max(self._ticks, ticks)
+        due.sort(key=lambda timer: timer.deadline)
+        return due
+
+    def _next(self) -> Optional[int]:
+        """
+        the next tick whose slot holds a timer, None when the wheel is empty
+        """
+        if not self._count:
+            return None
+
+        slots = len(self._wheel)
+        for t in range(self._ticks + 1, self._ticks + slots + 1):
+            if self._wheel[t % slots]:
+                return t
+        return None
+
+    def _run(self, timer: Timer, now: float):
+        if timer.cancelled:
+            return
+
+        try:
+            delay = timer.func(*timer.args)
+        except Exception as e:
+            logger.error(f'scheduled call {timer.func} failed: {e}')
+            delay = None
+
+        if timer.period is None or timer.cancelled:
+            return
+
+        if delay is not None:
+            timer.deadline = self.clock() + delay
+        else:  # at a fixed rate, unless the call overran its period
+            timer.deadline = timer.deadline + timer.period
+            if timer.deadline <= now:
+                timer.deadline = now + timer.period
+
+        with self._lock:
+            self._add(timer)
+
+    def _retired(self, generation: int) -> bool:
+        return self._stopped or self._generation != generation
+
+    def _loop(self, generation: int):
+        while True:
+            with self._lock:
+                if self._retired(generation):
+                    return
+
+                self._wake = self._next()
+                if self._wake is None:
+                    self._changed.wait()
+                else:
+                    wait = self._origin + self._wake * self.tick - self.clock()
+                    if wait > 0:
+                        self._changed.wait(wait)
+                self._wake = None
+                if self._retired(generation):
+                    return
+
+            self.advance()
+
+    def _work(self, generation: int):
+        while True:
+            with self._lock:
+                while not self._blocked and not self._retired(generation):
+                    self._changed.wait()
+                if self._retired(generation):
+                    return
+                timer = self._blocked.popleft()
+
+            self._run(timer, self.clock())
+
+
+scheduler = Scheduler()
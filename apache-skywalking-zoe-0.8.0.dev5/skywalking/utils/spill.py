@@ -0,0 +1,212 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import mmap
+import os
+import struct
+from collections import deque
+from threading import Lock
+from typing import Optional
+
+from skywalking.loggings import logger
+from skywalking.utils.integer import AtomicInteger
+
+_header = struct.Struct('<I')  # length prefix of every record, a zero length marks the end of the written records
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists but belongs to someone else
+        return True
+    return True
+
+
+class SpillBuffer:
+    """
+    An append-only queue of byte records kept in memory-mapped files of file_size bytes under directory, the oldest
+    file is replayed first and removed once it has been read to the end. Records are refused, and counted as dropped,
+    when max_size bytes of files are already in use.
+
+    Files are named `<kind>.<pid>.<sequence>.spill`, the files left behind by processes that are no longer alive
+    are picked up and replayed as well. A left behind file is first renamed to carry the pid of the process taking it
+    over, so when several processes share the directory only the one whose rename succeeded replays it.
+
+    Files are only sealed once full or when the buffer is flushed at shutdown, the file being written is replayed in
+    place, so replaying while writing never leaves a trail of small files behind.
+    """
+
+    def __init__(self, directory: str, kind: str, max_size: int, file_size: int):
+        self.directory = directory
+        self.kind = kind
+        self.max_files = max(max_size // file_size, 2)  # one being written, one being read
+        self.file_size = file_size
+        self.dropped = AtomicInteger(var=0)
+
+        self._lock = Lock()
+        self._sequence = 0
+        self._files = 0
+        self._sealed = deque()  # paths of the files completely written, oldest first
+        self._writer = None  # type: Optional[mmap.mmap]
+        self._writer_path = None  # type: Optional[str]
+        self._write_offset = 0
+        self._reader = None  # type: Optional[mmap.mmap]
+        self._reader_path = None  # type: Optional[str]
+        self._read_offset = 0
+        self._full = False  # the last record was refused for lack of room, until a file is released
+
+        os.makedirs(directory, exist_ok=True)
+        self._adopt()
+
+    def _adopt(self):
+        for name in sorted(os.listdir(self.directory)):
+            parts = name.split('.')
+            if len(parts) != 4 or parts[0] != self.kind or parts[3] != 'spill' or not parts[1].isdigit():
+                continue
+            pid = int(parts[1])
+            if pid == os.getpid() or _alive(pid):
+                continue
+
+            claimed = os.path.join(self.directory, f'{self.kind}.{os.getpid()}.{pid}-{parts[2]}.spill')
+            try:
+                os.rename(os.path.join(self.directory, name), claimed)
+            except OSError:  # taken over by another process first
+                continue
+            self._sealed.append(claimed)
+            self._files += 1
+
+        if self._sealed:
+            logger.info('replaying %d spilled %s files left behind in %s', len(self._sealed), self.kind, self.directory)
+
+    def _roll(self) -> bool:
+        if self._writer is not None:
+            self._seal()
+
+        if self._files >= self.max_files:
+            return False
+
+        self._sequence += 1
+        self._writer_path = os.path.join(self.directory, f'{self.kind}.{os.getpid()}.{self._sequence:010d}.spill')
+        with open(self._writer_path, 'w+b') as f:
+            f.truncate(self.file_size)  # sparse, zero filled, so the records are always followed by an end marker
+            self._writer = mmap.mmap(f.fileno(), self.file_size)
+        self._write_offset = 0
+        self._files += 1
+        return True
+
+    def _seal(self):
+        self._writer.flush()
+        self._writer.close()
+        if self._reader_path != self._writer_path:  # otherwise it is already being replayed
+            self._sealed.append(self._writer_path)
+        self._writer = self._writer_path = None
+        self._write_offset = 0
+
+    def put(self, record: bytes) -> bool:
+        """
+        :return: False if the record was dropped because the buffer is full
+        """
+        size = _header.size + len(record)
+        with self._lock:
+            # always leave room for the end marker
+            if self._writer is None or self._write_offset + size + _header.size > self.file_size:
+                if size + _header.size > self.file_size or not self._roll():
+                    self._full = True
+                    self.dropped.add_and_get(1)
+                    return False
+
+            offset = self._write_offset
+            self._writer[offset:offset + size] = _header.pack(len(record)) + record
+            self._write_offset = offset + size
+            return True
+
+    def get(self) -> Optional[bytes]:
+        """
+        :return: the oldest record or None if there are none
+        """
+        with self._lock:
+            while True:
+                if self._reader_path is None:
+                    if self._sealed:
+                        self._reader_path = self._sealed.popleft()
+                    elif self._writer is not None and self._write_offset > 0:
+                        self._reader_path = self._writer_path  # replayed in place, it is sealed once full
+                    else:
+                        return None
+
+                    with open(self._reader_path, 'rb') as f:
+                        size = os.fstat(f.fileno()).st_size
+                        self._reader = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) if size else None
+                    self._read_offset = 0
+
+                offset = self._read_offset
+                length = 0
+                if self._reader is not None and offset + _header.size <= len(self._reader):
+                    length, = _header.unpack_from(self._reader, offset)
+
+                if length == 0 or offset + _header.size + length > len(self._reader):
+                    if self._reader_path == self._writer_path:  # caught up with the writer
+                        return None
+                    self._release()
+                    continue
+
+                self._read_offset = offset + _header.size + length
+                return self._reader[offset + _header.size:self._read_offset]
+
+    def _release(self):
+        if self._reader is not None:
+            self._reader.close()
+        try:
+            os.remove(self._reader_path)
+        except OSError:
+            pass
+        self._reader = self._reader_path = None
+        self._files -= 1
+        self._full = False
+
+    def full(self) -> bool:
+        """
+        whether records are being refused, read without taking the lock
+        """
+        return self._full
+
+    def empty(self) -> bool:
+        with self._lock:
+            if self._sealed:
+                return False
+            if self._reader_path is not None and self._reader_path != self._writer_path:
+                return False
+            caught_up = self._reader_path == self._writer_path and self._read_offset == self._write_offset
+            return not self._write_offset or caught_up
+
+    def flush(self):
+        """
+        write everything to disk, at shutdown, the records of the file being written which were replayed already are
+        dropped from it so the next process does not replay them again
+        """
+        with self._lock:
+            if self._writer is None:
+                return
+
+            if self._reader_path == self._writer_path and self._read_offset:
+                left = self._write_offset - self._read_offset
+                self._writer.move(0, self._read_offset, left)
+                self._writer[left:left + _header.size] = _header.pack(0)
+                self._write_offset, self._read_offset = left, 0
+            self._writer.flush()
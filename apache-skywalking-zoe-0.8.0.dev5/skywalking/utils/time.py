@@ -17,6 +17,9 @@
 
 import time
 
+# the cpu time of the calling thread, python 3.7+, the cpu time of the whole process is the closest before
+thread_time = getattr(time, 'thread_time', time.process_time)
+
 
 def current_milli_time():
     return round(time.time() * 1000)
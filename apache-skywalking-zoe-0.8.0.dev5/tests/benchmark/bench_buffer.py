@@ -0,0 +1,81 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Times archiving into queue.Queue against BoundedBuffer with 8, 32 and 64 producer threads and the single consumer of
+the report thread, run with `python -m tests.benchmark.bench_buffer`.
+"""
+
+import threading
+import time
+from queue import Empty, Full, Queue
+
+from skywalking.utils.buffer import BoundedBuffer
+
+PUTS = 200000  # in total, split among the producers
+MAXSIZE = 10000
+
+
+def run(queue, producers: int) -> tuple:
+    """
+    :return: the puts per second and the items dropped because the queue was full
+    """
+    dropped = [0] * producers
+    finished = threading.Event()
+
+    def produce(index: int):
+        for i in range(PUTS // producers):
+            try:
+                queue.put(i, block=False)
+            except Full:
+                dropped[index] += 1
+
+    def consume():
+        while True:
+            try:
+                queue.get(block=True, timeout=0.01)
+            except Empty:
+                if finished.is_set():
+                    return
+                continue
+            queue.task_done()
+
+    consumer = threading.Thread(target=consume)
+    threads = [threading.Thread(target=produce, args=(i,)) for i in range(producers)]
+    consumer.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    finished.set()
+    consumer.join()
+
+    return PUTS // producers * producers / elapsed, sum(dropped)
+
+
+def main():
+    print(f'{"producers":>9} {"Queue puts/s":>13} {"dropped":>8} {"BoundedBuffer puts/s":>21} {"dropped":>8}')
+    for producers in (8, 32, 64):
+        queue = run(Queue(maxsize=MAXSIZE), producers)
+        buffer = run(BoundedBuffer(maxsize=MAXSIZE), producers)
+        print(f'{producers:>9} {queue[0]:>13.0f} {queue[1]:>8} {buffer[0]:>21.0f} {buffer[1]:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Times injecting the sw8 and sw8-correlation headers of an exit span and extracting them into a carrier for the entry
+span of the next service, then the sw8 header alone against encoding and decoding every field with the base64 module
+as before the field caches, run with `python -m tests.benchmark.bench_carrier`.
+"""
+
+import base64
+import timeit
+
+from skywalking import Component
+from skywalking.trace.carrier import Carrier
+from skywalking.trace.context import SpanContext
+
+from tests.benchmark import tracing
+
+NUMBER = 20000
+
+
+def base64_val(carrier: Carrier) -> str:
+    fields = (carrier.trace_id, carrier.segment_id, carrier.service, carrier.service_instance, carrier.endpoint,
+              carrier.client_address)
+    encoded = [base64.b64encode(field.encode('utf8')).decode('utf8') for field in fields]
+    return '-'.join(['1' if carrier.sampled else '0', encoded[0], encoded[1], carrier.span_id] + encoded[2:])
+
+
+def base64_parse(val: str) -> list:
+    parts = val.split('-')
+    return [base64.b64decode(part).decode('utf8') for i, part in enumerate(parts) if i not in (0, 3)]
+
+
+def main():
+    tracing.setup()
+    context = SpanContext()
+    with context.new_entry_span(op='/orders') as entry:
+        entry.component = Component.Flask
+        context.put_correlation('tenant', 'acme')
+        with context.new_exit_span(op='/users/{id}', peer='users:8080', component=Component.Requests) as exit_:
+            carrier = exit_.inject()
+    headers = {item.key: item.val for item in carrier}
+
+    def inject():
+        return {item.key: item.val for item in exit_.inject()}
+
+    def extract():
+        incoming = Carrier()
+        for item in incoming:
+            if item.key in headers:
+                item.val = headers[item.key]
+        return incoming
+
+    parsed = Carrier()
+
+    def decode():
+        parsed.val = headers['sw8']
+
+    timings = [
+        ('inject', inject),
+        ('extract', extract),
+        ('sw8 encode', lambda: carrier.val),
+        ('sw8 encode, base64', lambda: base64_val(carrier)),
+        ('sw8 decode', decode),
+        ('sw8 decode, base64', lambda: base64_parse(headers['sw8'])),
+    ]
+    print(f'{"":<22} {"ops/s":>9}')
+    for name, func in timings:
+        best = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(f'{name:<22} {NUMBER / best:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
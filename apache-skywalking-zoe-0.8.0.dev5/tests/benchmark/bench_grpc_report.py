@@ -0,0 +1,80 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Times GrpcProtocol.report streaming a SegmentObject per segment against batches of SW_AGENT_REPORT_BATCH_SIZE segments
+in one SegmentCollection, over a stub which serializes the messages like the grpc channel would, run with
+`python -m tests.benchmark.bench_grpc_report`.
+"""
+
+import time
+
+from skywalking import config
+from skywalking.agent.protocol.grpc import GrpcProtocol
+from skywalking.client.grpc import GrpcTraceSegmentReportService
+from skywalking.utils.buffer import BoundedBuffer
+
+from tests.benchmark import tracing
+
+SEGMENTS = 5000
+
+
+class _Stub:
+    """
+    the TraceSegmentReportService stub, without the network
+    """
+
+    def collect(self, generator):
+        for segment in generator:
+            segment.SerializeToString()
+
+    def collectInSync(self, collection):  # noqa
+        collection.SerializeToString()
+
+
+def protocol() -> GrpcProtocol:
+    reporter = GrpcTraceSegmentReportService.__new__(GrpcTraceSegmentReportService)
+    reporter.report_stub = _Stub()
+    protocol = GrpcProtocol.__new__(GrpcProtocol)  # no channel
+    protocol.traces_reporter = reporter
+    return protocol
+
+
+def main():
+    tracing.setup()
+    segments = tracing.segments(SEGMENTS)
+    reporter = protocol()
+
+    print(f'{"batch":>6} {"segments/s":>11}')
+    for batch in (0, 10, 100, 1000):
+        config.report_batch_size = batch
+        best = None
+        for _ in range(5):
+            queue = BoundedBuffer(maxsize=SEGMENTS)
+            for segment in segments:
+                queue.put(segment)
+
+            start = time.perf_counter()
+            reporter.report(queue, block=False)
+            elapsed = time.perf_counter() - start
+            assert queue.empty()
+            best = elapsed if best is None else min(best, elapsed)
+        print(f'{batch or "stream":>6} {SEGMENTS / best:>11.0f}')
+
+
+if __name__ == '__main__':
+    main()
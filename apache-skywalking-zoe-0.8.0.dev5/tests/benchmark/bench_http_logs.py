@@ -0,0 +1,64 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Times encoding a batch of log data for the http reporter, read straight into dicts against the MessageToJson and
+json.loads round trip it replaced, up to the json body posted, run with `python -m tests.benchmark.bench_http_logs`.
+"""
+
+import json
+import timeit
+
+from google.protobuf import json_format
+
+from skywalking.client.http import HttpLogDataReportService
+from skywalking.protocol.common.Common_pb2 import KeyStringValuePair
+from skywalking.protocol.logging.Logging_pb2 import LogData, LogDataBody, TraceContext, LogTags, TextLog
+
+BATCH = 1000
+
+
+def log_data(i: int) -> LogData:
+    # as built by the logging plugin
+    return LogData(
+        timestamp=1700000000000 + i,
+        service='bench',
+        serviceInstance='bench-instance',
+        endpoint='/orders',
+        body=LogDataBody(type='text', text=TextLog(text=f'order {i} accepted for customer {i % 97}')),
+        traceContext=TraceContext(traceId=f'prefix.{i}', traceSegmentId=f'prefix.{i + 1}', spanId=0),
+        tags=LogTags(data=[KeyStringValuePair(key='level', value='INFO'),
+                           KeyStringValuePair(key='logger', value='orders'),
+                           KeyStringValuePair(key='thread', value='MainThread')]),
+    )
+
+
+def main():
+    logs = [log_data(i) for i in range(BATCH)]
+    encodings = [
+        ('dict', lambda: json.dumps([HttpLogDataReportService._transform(log) for log in logs])),
+        ('MessageToJson', lambda: json.dumps([json.loads(json_format.MessageToJson(log)) for log in logs])),
+    ]
+
+    print(f'{"":<14} {"logs/s":>9}')
+    for name, encode in encodings:
+        best = min(timeit.repeat(encode, number=5, repeat=5)) / 5
+        print(f'{name:<14} {BATCH / best:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
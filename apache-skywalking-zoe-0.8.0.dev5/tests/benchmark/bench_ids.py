@@ -0,0 +1,65 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Times generating trace and segment ids from 1, 8 and 32 threads at once, against the uuid1 strings they used to be,
+run with `python -m tests.benchmark.bench_ids`.
+"""
+
+import threading
+import time
+import uuid
+
+from skywalking.trace import ID
+
+IDS = 200000  # in total, split among the threads
+
+
+def uuid1_id() -> str:
+    return str(uuid.uuid1()).replace('-', '')
+
+
+def run(generate, threads: int) -> float:
+    """
+    :return: the ids generated per second
+    """
+    ids = [None] * threads
+
+    def work(index: int):
+        ids[index] = [generate() for _ in range(IDS // threads)]
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    generated = [str(i) for chunk in ids for i in chunk]
+    assert len(set(generated)) == len(generated), 'duplicate ids'
+    return len(generated) / elapsed
+
+
+def main():
+    print(f'{"threads":>7} {"ID ids/s":>10} {"uuid1 ids/s":>12}')
+    for threads in (1, 8, 32):
+        print(f'{threads:>7} {run(ID, threads):>10.0f} {run(uuid1_id, threads):>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Times the ignore path check of entry spans with 10, 100 and 1000 patterns, the single alternation regex config used to
+build against PathMatcher with and without its cache, run with `python -m tests.benchmark.bench_ignore_path`.
+"""
+
+import random
+import re
+import timeit
+
+from skywalking.utils.path_matcher import PathMatcher, translate
+
+SUFFIXES = '.jpg,.jpeg,.js,.css,.png,.bmp,.gif,.ico,.mp3,.mp4,.html,.svg'
+OPS = 1000
+
+
+def alternation(paths: str, suffixes: str):
+    """
+    the regex config.finalize compiled before PathMatcher
+    """
+    reesc = re.compile(r'([.*+?^=!:${}()|\[\]\\])')
+    suffix = r'^.+(?:' + '|'.join(reesc.sub(r'\\\1', s.strip()) for s in suffixes.split(',')) + ')$'
+    path = '^(?:' + '|'.join(translate(p) for p in paths.split(',')) + ')$'
+    return re.compile(f'{suffix}|{path}')
+
+
+def patterns(count: int, rand: random.Random) -> str:
+    kinds = ('/api/v{}/users/*', '/static/{}/**', '/health/{}', '/internal/{}/?/status')
+    return ','.join(rand.choice(kinds).format(i) for i in range(count))
+
+
+def ops(count: int, rand: random.Random) -> list:
+    kinds = ('/api/v{}/users/{}', '/static/{}/js/app{}.js', '/health/{}', '/orders/{}/items/{}',
+             '/internal/{}/a/status')
+    return [rand.choice(kinds).format(rand.randrange(1000), i) for i in range(count)]
+
+
+def main():
+    rand = random.Random(42)
+    print(f'{"patterns":>8} {"regex":>8} {"matcher":>8} {"cached":>8}  (us per op over {OPS} distinct ops)')
+    for count in (10, 100, 1000):
+        paths, sample = patterns(count, rand), ops(OPS, rand)
+        regex = alternation(paths, SUFFIXES)
+        matcher = PathMatcher(paths, SUFFIXES, cache_size=0)
+        cached = PathMatcher(paths, SUFFIXES, cache_size=OPS)
+        assert [bool(regex.match(op)) for op in sample] == [matcher.match(op) for op in sample]
+
+        timings = []
+        for match in (regex.match, matcher.match, cached.match):
+            runs = timeit.repeat(lambda: [match(op) for op in sample], number=10, repeat=5)
+            timings.append(min(runs) / 10 / OPS * 1e6)
+        print(f'{count:>8} {timings[0]:>8.2f} {timings[1]:>8.2f} {timings[2]:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Pushes segments through the kafka segment reporter into a stub producer whose broker acknowledges the records in
+batches from another thread, failing some of them, and reports the records sent per second along with the delivery
+counters, run with `python -m tests.benchmark.bench_kafka`.
+"""
+
+import threading
+import time
+from collections import deque
+
+from skywalking.client import kafka
+from skywalking.client.kafka import KafkaTraceSegmentReportService
+
+from tests.benchmark import tracing
+
+SEGMENTS = 20000
+FAILED_EVERY = 100  # records
+
+
+class _Future:
+    """
+    calls its callbacks once delivered, or right away when added after that, like the futures of kafka-python
+    """
+    __slots__ = ('lock', 'callbacks', 'errbacks', 'delivered', 'exception')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.callbacks = []
+        self.errbacks = []
+        self.delivered = False
+        self.exception = None
+
+    def add_callback(self, func, *args):
+        with self.lock:
+            if not self.delivered:
+                self.callbacks.append((func, args))
+                return
+        if self.exception is None:
+            func(*args, None)
+
+    def add_errback(self, func, *args):
+        with self.lock:
+            if not self.delivered:
+                self.errbacks.append((func, args))
+                return
+        if self.exception is not None:
+            func(*args, self.exception)
+
+    def deliver(self, exception: Exception = None):
+        with self.lock:
+            self.delivered, self.exception = True, exception
+        if exception is None:
+            for func, args in self.callbacks:
+                func(*args, None)
+        else:
+            for func, args in self.errbacks:
+                func(*args, exception)
+
+
+class _StubProducer:
+    """
+    acknowledges what was sent every `linger` seconds, as a producer delivering its batches would
+    """
+
+    def __init__(self, linger: float):
+        self.linger = linger
+        self.pending = deque()
+        self.sent = 0
+        self.stopped = threading.Event()
+        self.broker = threading.Thread(target=self._deliver, daemon=True)
+        self.broker.start()
+
+    def send(self, topic: str, key: bytes, value: bytes) -> _Future:
+        future = _Future()
+        self.pending.append(future)
+        self.sent += 1
+        return future
+
+    def close(self):
+        self.stopped.set()
+        self.broker.join()
+
+    def _deliver(self):
+        delivered = 0
+        while True:
+            stopped = self.stopped.wait(self.linger)
+            while self.pending:
+                delivered += 1
+                self.pending.popleft().deliver(None if delivered % FAILED_EVERY else Exception('rejected'))
+            if stopped:
+                return
+
+
+def main():
+    tracing.setup()
+    segments = [segment.transform() for segment in tracing.segments(SEGMENTS)]
+
+    print(f'{"linger ms":>9} {"records/s":>10} {"acked":>7} {"failed":>7} {"in flight at end":>17}')
+    for linger in (0.001, 0.01, 0.1):
+        kafka.delivery_metrics = metrics = kafka.DeliveryMetrics()
+        reporter = KafkaTraceSegmentReportService.__new__(KafkaTraceSegmentReportService)  # no broker connection
+        reporter.producer = producer = _StubProducer(linger)
+        reporter.topic = 'skywalking-segments'
+
+        start = time.perf_counter()
+        reporter.report(iter(segments))
+        elapsed = time.perf_counter() - start
+        in_flight = metrics.in_flight_bytes.get()
+        producer.close()
+
+        assert metrics.acked.get() + metrics.failed.get() == producer.sent == SEGMENTS
+        assert metrics.in_flight_bytes.get() == 0
+        print(f'{linger * 1000:>9.0f} {SEGMENTS / elapsed:>10.0f} {metrics.acked.get():>7} {metrics.failed.get():>7} '
+              f'{in_flight:>17}')
+
+
+if __name__ == '__main__':
+    main()
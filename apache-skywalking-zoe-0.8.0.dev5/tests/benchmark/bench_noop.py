@@ -0,0 +1,56 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Times the tracing overhead per call of a request, an entry span over an exit span, when it is traced, when its path
+is ignored and when tracing is disabled, run with `python -m tests.benchmark.bench_noop`.
+"""
+
+import timeit
+
+from skywalking import Component, config
+from skywalking.trace.context import get_context
+from skywalking.trace.tags import TagHttpMethod
+
+from tests.benchmark import tracing
+
+NUMBER = 20000
+
+
+def request(op: str):
+    # what a web plugin and a client plugin do
+    with get_context().new_entry_span(op=op) as entry:
+        entry.component = Component.Flask
+        entry.tag(TagHttpMethod('GET'))
+        with get_context().new_exit_span(op='/users', peer='users:8080', component=Component.Requests) as exit_:
+            exit_.inject()
+
+
+def main():
+    tracing.setup(trace_ignore_path='/health')
+
+    print(f'{"":<9} {"us/call":>8}')
+    cases = (('traced', '/orders', True), ('ignored', '/health', True), ('disabled', '/orders', False))
+    for name, op, enabled in cases:
+        config.init(tracing_enabled=enabled)
+        best = min(timeit.repeat(lambda: request(op), number=NUMBER, repeat=5))
+        print(f'{name:<9} {best / NUMBER * 1e6:>8.2f}')
+    config.init(tracing_enabled=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Measures the memory held by the segment of a traced request, with tracemalloc, and the spans created per second, run
+with `python -m tests.benchmark.bench_span_memory`.
+"""
+
+import time
+import tracemalloc
+
+from tests.benchmark import tracing
+
+REQUESTS = 2000
+
+
+def main():
+    tracing.setup()
+    tracing.segments(100)  # warm up the caches, interned strings and lazily imported modules
+
+    print(f'{"exits":>5} {"bytes/request":>14} {"spans/s":>9}')
+    for exits in (0, 2, 10):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        segments = tracing.segments(REQUESTS, exits)  # kept alive, as they are while waiting in the queue
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        held = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        del segments
+
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            tracing.trace(exits)
+        elapsed = time.perf_counter() - start
+        print(f'{exits:>5} {held / REQUESTS:>14.0f} {REQUESTS * (exits + 1) / elapsed:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
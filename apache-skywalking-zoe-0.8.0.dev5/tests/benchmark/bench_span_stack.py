@@ -0,0 +1,55 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Times a trace of an entry span over a chain of nested local spans 1, 10 and 100 deep, as left by @trace decorated
+functions calling each other, run with `python -m tests.benchmark.bench_span_stack`.
+"""
+
+import timeit
+
+from skywalking import Component
+from skywalking.trace.context import get_context
+
+from tests.benchmark import tracing
+
+
+def nested(depth: int):
+    if not depth:
+        return
+    with get_context().new_local_span(op=f'level{depth}'):
+        nested(depth - 1)
+
+
+def request(depth: int):
+    with get_context().new_entry_span(op='/orders') as entry:
+        entry.component = Component.Flask
+        nested(depth)
+
+
+def main():
+    tracing.setup()
+
+    print(f'{"depth":>5} {"us/trace":>9} {"us/span":>8}')
+    for depth in (1, 10, 100):
+        number = 20000 // depth
+        best = min(timeit.repeat(lambda: request(depth), number=number, repeat=5)) / number * 1e6
+        print(f'{depth:>5} {best:>9.1f} {best / (depth + 1):>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Tracing in process for the benchmarks, without starting the agent or reaching a backend.
+"""
+
+from typing import Callable, List
+
+from skywalking import Component, Layer, agent, config, endpoint, profile, sampling
+from skywalking.trace import context
+from skywalking.trace.context import SpanContext
+from skywalking.trace.segment import Segment
+from skywalking.trace.tags import TagDbStatement, TagDbType, TagHttpMethod, TagHttpStatusCode, TagHttpURL
+
+
+def setup(archive: Callable[[Segment], None] = None, **options):
+    """
+    initialize what tracing needs, finished segments are handed to `archive` instead of the report queue
+    """
+    config.init(**options)
+    config.finalize()
+    sampling.init()
+    profile.init()
+    endpoint.init()
+
+    agent.archive = archive or (lambda segment: None)
+    context.isfull = lambda: False
+
+
+def trace(exits: int = 2):
+    """
+    a request, an entry span with its http tags over `exits` database calls
+    """
+    with SpanContext().new_entry_span(op='/users/{id}') as entry:
+        entry.layer = Layer.Http
+        entry.component = Component.Flask
+        entry.tag(TagHttpMethod('GET'))
+        entry.tag(TagHttpURL('http://localhost:8080/users/42'))
+        for _ in range(exits):
+            with entry.context.new_exit_span(op='users', peer='mysql:3306', component=Component.PyMysql) as exit_:
+                exit_.layer = Layer.Database
+                exit_.tag(TagDbType('mysql'))
+                exit_.tag(TagDbStatement('SELECT id, name FROM users WHERE id = %s'))
+        entry.tag(TagHttpStatusCode(200))
+
+
+def segments(count: int, exits: int = 2) -> List[Segment]:
+    """
+    the segments of `count` requests, tracing has to be set up beforehand
+    """
+    archived = []
+    archive, agent.archive = agent.archive, archived.append
+    try:
+        for _ in range(count):
+            trace(exits)
+    finally:
+        agent.archive = archive
+    return archived
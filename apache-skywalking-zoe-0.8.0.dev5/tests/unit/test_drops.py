@@ -0,0 +1,86 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+
+from skywalking.telemetry.drops import DropReporter
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDropReporter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.logs = []
+        self.drops = DropReporter(interval=10, clock=self.clock, log=lambda msg, *args: self.logs.append(msg % args))
+
+    def test_one_summary_per_interval(self):
+        for _ in range(1000):
+            self.drops.record('segment')
+        self.drops.record('log', 3)
+        self.assertEqual(self.logs, [])
+
+        self.clock.now += 10
+        self.drops.record('segment')
+        self.assertEqual(self.logs, [
+            'dropped 3 log, 1001 segment item(s) in the last 10s because the queues were full or tail sampling left '
+            'them out'
+        ])
+
+        # the next drops only show up in the summary of the next interval
+        self.drops.record('segment', 5)
+        self.clock.now += 9
+        self.drops.flush()
+        self.assertEqual(len(self.logs), 1)
+        self.clock.now += 1
+        self.drops.flush()
+        self.assertEqual(len(self.logs), 2)
+        self.assertTrue(self.logs[1].startswith('dropped 5 segment item(s) in the last 10s'))
+
+    def test_nothing_logged_without_drops(self):
+        self.clock.now += 100
+        self.drops.flush()
+        self.drops.flush(force=True)
+        self.assertEqual(self.logs, [])
+
+    def test_force_flush(self):
+        self.drops.record('snapshot', 2)
+        self.clock.now += 1
+        self.drops.flush(force=True)
+        self.assertEqual(len(self.logs), 1)
+        self.assertTrue(self.logs[0].startswith('dropped 2 snapshot item(s) in the last 1s'))
+
+    def test_totals_are_kept_across_summaries(self):
+        self.drops.record('segment', 2)
+        self.clock.now += 10
+        self.drops.flush()
+        self.drops.record('segment', 3)
+        self.drops.record('tail_sample')
+        self.assertEqual(self.drops.totals, {'segment': 5, 'tail_sample': 1})
+
+        self.drops.reset()
+        self.assertEqual(self.drops.totals, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import re
+import unittest
+
+from skywalking import agent, config, endpoint
+from skywalking.endpoint.endpoint_grouper import OVERFLOW_ENDPOINT, EndpointGrouper, IdGrouping, RegexGrouping, \
+    TemplateGrouping, build
+from skywalking.trace import context
+from skywalking.trace.context import SpanContext
+from skywalking.trace.span import NoopSpan
+
+from tests.benchmark import tracing
+
+
+class TestGroupings(unittest.TestCase):
+    def test_template(self):
+        grouping = TemplateGrouping(['/users/{id}', '/users/{id}/orders/{order}', '/users/me'])
+        self.assertEqual(grouping.group('/users/42'), '/users/{id}')
+        self.assertEqual(grouping.group('/users/42/orders/7'), '/users/{id}/orders/{order}')
+        # templates are tried in order, a literal segment after a matching template never wins
+        self.assertEqual(grouping.group('/users/me'), '/users/{id}')
+        self.assertIsNone(grouping.group('/users/42/orders'))
+        self.assertIsNone(grouping.group('/orders/42'))
+
+    def test_regex(self):
+        grouping = RegexGrouping([(re.compile(r'/api/(v\d+)/items/.+'), r'/api/\1/items/{item}'),
+                                  (re.compile(r'(?P<queue>\w+)-\d+'), r'\g<queue>-{partition}')])
+        self.assertEqual(grouping.group('/api/v2/items/a/b'), '/api/v2/items/{item}')
+        self.assertEqual(grouping.group('orders-3'), 'orders-{partition}')
+        # the whole op has to match
+        self.assertIsNone(grouping.group('/x/api/v2/items/a'))
+        self.assertIsNone(grouping.group('orders-3/x'))
+
+    def test_ids(self):
+        grouping = IdGrouping()
+        self.assertEqual(grouping.group('/users/42/orders/7'), '/users/{id}/orders/{id}')
+        self.assertEqual(grouping.group('/carts/123e4567-e89b-12d3-a456-426614174000'), '/carts/{id}')
+        self.assertEqual(grouping.group('/blobs/0123456789abcdef0123'), '/blobs/{id}')
+        self.assertIsNone(grouping.group('/blobs/cafe'))  # too short to be an id
+        self.assertIsNone(grouping.group('/users/me'))
+        self.assertIsNone(grouping.group('orders-42'))  # not a url path
+
+
+class TestEndpointGrouper(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(config.init, endpoint_templates=config.endpoint_templates,
+                        endpoint_rules=config.endpoint_rules, endpoint_group_ids=config.endpoint_group_ids,
+                        endpoint_max_count=config.endpoint_max_count)
+
+    def test_first_grouping_wins(self):
+        config.init(endpoint_templates='/users/{user}', endpoint_rules=r'/files/.*=/files/{path}',
+                    endpoint_group_ids=True, endpoint_max_count=0)
+        grouper = build()
+        self.assertEqual(grouper.group('/users/42'), '/users/{user}')  # the template, not the ids
+        self.assertEqual(grouper.group('/files/42/7'), '/files/{path}')
+        self.assertEqual(grouper.group('/orders/42'), '/orders/{id}')
+        self.assertEqual(grouper.group('/orders/me'), '/orders/me')
+
+    def test_invalid_rule_is_skipped(self):
+        config.init(endpoint_templates='', endpoint_rules=r'/a/(=x;no-name;/b/.*=/b/{x}', endpoint_group_ids=False,
+                    endpoint_max_count=0)
+        with self.assertLogs('skywalking', 'WARNING'):
+            grouper = build()
+        self.assertEqual(grouper.group('/b/1'), '/b/{x}')
+        self.assertEqual(grouper.group('/a/1'), '/a/1')
+
+    def test_ids_disabled(self):
+        config.init(endpoint_templates='', endpoint_rules='', endpoint_group_ids=False, endpoint_max_count=0)
+        self.assertEqual(build().group('/orders/42'), '/orders/42')
+
+    def test_cardinality_cap(self):
+        grouper = EndpointGrouper([IdGrouping()], max_endpoints=2)
+        self.assertEqual(grouper.group('/a'), '/a')
+        self.assertEqual(grouper.group('/b/1'), '/b/{id}')
+        with self.assertLogs('skywalking', 'WARNING') as logs:
+            self.assertEqual(grouper.group('/c'), OVERFLOW_ENDPOINT)
+            self.assertEqual(grouper.group('/d'), OVERFLOW_ENDPOINT)
+        self.assertEqual(len(logs.records), 1)  # warned once
+
+        # the names handed out before the cap keep being reported, grouped ops included
+        self.assertEqual(grouper.group('/a'), '/a')
+        self.assertEqual(grouper.group('/b/2'), '/b/{id}')
+
+    def test_cardinality_cap_without_cache(self):
+        grouper = EndpointGrouper([], max_endpoints=1, cache_size=0)
+        self.assertEqual(grouper.group('/a'), '/a')
+        self.assertEqual(grouper.group('/b'), OVERFLOW_ENDPOINT)
+        self.assertEqual(grouper.group('/a'), '/a')
+
+    def test_added_grouping_goes_first(self):
+        grouper = EndpointGrouper([IdGrouping()], cache_size=16)
+        self.assertEqual(grouper.group('/orders/42'), '/orders/{id}')
+        grouper.add(TemplateGrouping(['/orders/{order}']))
+        self.assertEqual(grouper.group('/orders/42'), '/orders/{order}')  # the cached name is dropped
+
+
+class TestEntrySpan(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(config.finalize)
+        self.addCleanup(config.init, trace_ignore_path=config.trace_ignore_path,
+                        endpoint_templates=config.endpoint_templates, endpoint_max_count=config.endpoint_max_count)
+        self.addCleanup(setattr, endpoint, 'grouper', endpoint.grouper)
+        self.addCleanup(setattr, agent, 'archive', agent.archive)
+        self.addCleanup(setattr, context, 'isfull', context.isfull)
+
+        self.segments = []
+        tracing.setup(self.segments.append, trace_ignore_path='/health/**,/orders/7', endpoint_templates='',
+                      endpoint_max_count=1000)
+        endpoint.grouper = build()
+
+    def entry(self, op: str):
+        with SpanContext().new_entry_span(op=op) as span:
+            return span
+
+    def test_grouped_name_is_reported(self):
+        span = self.entry('/users/42')
+        self.assertEqual(span.op, '/users/{id}')
+        self.assertEqual(self.segments[0].spans[0].op, '/users/{id}')
+
+    def test_ignored_on_the_raw_op(self):
+        self.assertIsInstance(self.entry('/orders/7'), NoopSpan)
+        # grouped as /orders/{id} as well, but only the raw op is matched against the ignored paths
+        self.assertEqual(self.entry('/orders/8').op, '/orders/{id}')
+        self.assertIsInstance(self.entry('/health/42'), NoopSpan)
+        self.assertEqual(len(self.segments), 1)
+
+    def test_ignored_ops_do_not_count_against_the_cap(self):
+        endpoint.grouper = EndpointGrouper([IdGrouping()], max_endpoints=1)
+        self.entry('/health/1')
+        self.entry('/health/2')
+        self.assertEqual(self.entry('/users/42').op, '/users/{id}')
+        self.assertEqual(self.entry('/orders/8').op, OVERFLOW_ENDPOINT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from queue import Queue, Empty
+
+CHILDREN = 3
+CHILD_TRACES = 20
+
+
+def _record(out_dir: str, queue: Queue, block: bool):
+    while True:
+        try:
+            segment = queue.get(block=block, timeout=0.1)
+        except Empty:
+            return
+
+        with open(os.path.join(out_dir, str(os.getpid())), 'a') as f:
+            f.write(f'{segment.segment_id}\n')
+        queue.task_done()
+
+
+def _reported(out_dir: str, pid: int) -> list:
+    path = os.path.join(out_dir, str(pid))
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return f.read().split()
+
+
+def _wait_reported(out_dir: str, count: int, timeout: float = 10):
+    """
+    wait for the reporter thread of this process to report count segments, a reporter deadlocked by the fork never does
+    """
+    deadline = time.monotonic() + timeout
+    while len(_reported(out_dir, os.getpid())) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _run(out_dir: str):
+    """
+    start the agent, keep tracing on a thread while forking children which trace as well, every process records the
+    segments its reporter thread reports in a file named after its pid
+    """
+    from skywalking import agent, config, Component
+    from skywalking.agent.protocol import Protocol
+    from skywalking.agent.protocol import grpc as grpc_protocol
+    from skywalking.trace.context import SpanContext
+
+    class RecordingProtocol(Protocol):
+        def heartbeat(self):
+            pass
+
+        def report(self, queue: Queue, block: bool = True):
+            _record(out_dir, queue, block)
+
+        def report_log(self, queue: Queue, block: bool = True):
+            pass
+
+    grpc_protocol.GrpcProtocol = RecordingProtocol
+    config.init(service_name='fork-test', protocol='grpc', disable_plugins=['.*'])
+    agent.start()
+
+    def trace():
+        with SpanContext().new_entry_span(op='/fork') as span:
+            span.component = Component.Unknown
+
+    traced = 0
+    stopped = threading.Event()
+
+    def traffic():
+        nonlocal traced
+        while not stopped.is_set():
+            trace()
+            traced += 1
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=traffic, daemon=True)
+    thread.start()
+
+    pids = []
+    for _ in range(CHILDREN):
+        time.sleep(0.05)  # forks with segments being queued and reported
+        pid = os.fork()
+        if pid == 0:
+            try:
+                for _ in range(CHILD_TRACES):
+                    trace()
+                _wait_reported(out_dir, CHILD_TRACES)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+
+    stopped.set()
+    thread.join()
+    statuses = [os.waitpid(pid, 0)[1] for pid in pids]
+    _wait_reported(out_dir, traced)
+    agent.stop()
+
+    with open(os.path.join(out_dir, 'result.json'), 'w') as f:
+        json.dump({'parent': os.getpid(), 'traced': traced, 'children': pids, 'statuses': statuses}, f)
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'fork() is not available')
+class TestFork(unittest.TestCase):
+    def test_children_report_their_own_segments(self):
+        with tempfile.TemporaryDirectory() as out_dir:
+            root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+            # a fresh interpreter, the agent can only be started once per process, a deadlock times out here
+            process = subprocess.run([sys.executable, __file__, out_dir], env=env, timeout=60)
+            self.assertEqual(process.returncode, 0)
+
+            with open(os.path.join(out_dir, 'result.json')) as f:
+                result = json.load(f)
+            self.assertEqual(result['statuses'], [0] * CHILDREN)
+
+            parent = _reported(out_dir, result['parent'])
+            self.assertEqual(len(parent), result['traced'])
+
+            segments = set(parent)
+            for pid in result['children']:
+                child = _reported(out_dir, pid)
+                # only the child's own traces, the segments queued in the parent at fork time are the parent's
+                self.assertEqual(len(child), CHILD_TRACES)
+                segments.update(child)
+
+            # no segment reported twice, nor generated with the same id in two processes
+            self.assertEqual(len(segments), result['traced'] + CHILDREN * CHILD_TRACES)
+
+
+if __name__ == '__main__':
+    _run(sys.argv[1])
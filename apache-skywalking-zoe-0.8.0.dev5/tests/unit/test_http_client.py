@@ -0,0 +1,132 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import gzip
+import importlib.util
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from skywalking import agent, config, endpoint
+from skywalking.trace import context
+
+from tests.benchmark import tracing
+
+
+def _installed(module: str) -> bool:
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ImportError:  # the parent package is missing
+        return False
+
+
+class StubCollector(HTTPServer):
+    """
+    records the path, headers and decoded json body of every request, answers them all with 200
+    """
+
+    def __init__(self):
+        self.requests = []
+        super().__init__(('127.0.0.1', 0), self.Handler)
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        self.thread.join()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def do_POST(self):  # noqa
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            if self.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            self.server.requests.append((self.path, self.headers, json.loads(body), self.client_address))
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+
+@unittest.skipUnless(_installed('requests') and _installed('google.protobuf'), 'requests or protobuf is not installed')
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.collector = StubCollector()
+        self.addCleanup(self.collector.close)
+
+        self.addCleanup(config.init, collector_address=config.collector_address, http_compress=config.http_compress,
+                        force_tls=config.force_tls)
+        self.addCleanup(setattr, endpoint, 'grouper', endpoint.grouper)
+        self.addCleanup(setattr, agent, 'archive', agent.archive)
+        self.addCleanup(setattr, context, 'isfull', context.isfull)
+        tracing.setup(collector_address=f'127.0.0.1:{self.collector.server_port}', force_tls=False)
+
+    def test_post_json(self):
+        from skywalking.client.http import new_session, post_json
+
+        url = f'http://127.0.0.1:{self.collector.server_port}/v3/logs'
+        session = new_session()
+        self.addCleanup(session.close)
+
+        config.http_compress = False
+        post_json(session, url, [{'a': 1}])
+        config.http_compress = True
+        post_json(session, url, [{'a': 2}])
+
+        (_, plain, first, client), (_, gzipped, second, again) = self.collector.requests
+        self.assertIsNone(plain.get('Content-Encoding'))
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzipped['Content-Type'], 'application/json')
+        self.assertEqual((first, second), ([{'a': 1}], [{'a': 2}]))
+        self.assertEqual(client, again)  # over the same kept alive connection
+
+    def test_report_batch(self):
+        from skywalking.client.http import HttpTraceSegmentReportService
+
+        config.http_compress = True
+        service = HttpTraceSegmentReportService()
+        self.addCleanup(service.session.close)
+        segments = tracing.segments(3)
+        service.report_batch(segments)
+
+        [(path, headers, payload, _)] = self.collector.requests
+        self.assertEqual(path, '/v3/segments')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual([s['traceSegmentId'] for s in payload], [str(s.segment_id) for s in segments])
+        self.assertEqual([len(s['spans']) for s in payload], [3, 3, 3])  # the entry span over two exits
+        self.assertEqual(payload[0]['spans'][-1]['operationName'], '/users/{id}')
+
+    def test_report_one_by_one(self):
+        from skywalking.client.http import HttpTraceSegmentReportService
+
+        config.http_compress = False
+        service = HttpTraceSegmentReportService()
+        self.addCleanup(service.session.close)
+        service.report(iter(tracing.segments(2)))
+
+        self.assertEqual([path for path, _, _, _ in self.collector.requests], ['/v3/segment', '/v3/segment'])
+        self.assertTrue(all(isinstance(payload, dict) for _, _, payload, _ in self.collector.requests))
+
+
+if __name__ == '__main__':
+    unittest.main()
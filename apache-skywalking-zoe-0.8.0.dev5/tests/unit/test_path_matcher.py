@@ -0,0 +1,57 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+
+from skywalking import config
+from skywalking.utils.path_matcher import PathMatcher
+
+from tests.benchmark.bench_ignore_path import alternation
+
+
+class TestPathMatcher(unittest.TestCase):
+    def test_agrees_with_the_alternation_regex(self):
+        paths = '/eureka/**,/health,/api/v?/users/*,/static/**/*.map,/a/**/b'
+        suffixes = '.jpg,.js,.min.css'
+        regex = alternation(paths, suffixes)
+        matcher = PathMatcher(paths, suffixes)
+
+        for op in ('/eureka', '/eureka/', '/eureka/apps/x', '/health', '/health/x', '/api/v1/users/7',
+                   '/api/v10/users/7', '/api/v1/users/7/x', '/static/a/b/app.map', '/static/app.map', '/a/b',
+                   '/a/x/y/b', '/img/x.jpg', '.jpg', '/app.min.css', '/app.css', '', '/'):
+            self.assertEqual(matcher.match(op), bool(regex.match(op)), op)
+
+    def test_empty_pattern_matches_the_empty_op(self):
+        matcher = PathMatcher('', '')
+        self.assertTrue(matcher.match(''))
+        self.assertFalse(matcher.match('/'))
+
+    def test_empty_suffix_is_skipped(self):
+        self.assertFalse(PathMatcher('', '.js,,').match('/index.html'))
+
+    def test_deprecated_alias(self):
+        self.addCleanup(config.finalize)
+        self.addCleanup(config.init, trace_ignore_path=config.trace_ignore_path)
+        config.init(trace_ignore_path='/health')
+        config.finalize()
+        self.assertIs(config.RE_IGNORE_PATH, config.IGNORE_PATH)
+        self.assertTrue(config.RE_IGNORE_PATH.match('/health'))
+        self.assertFalse(config.RE_IGNORE_PATH.match('/orders'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+import time
+import unittest
+
+from skywalking.utils.scheduler import Scheduler
+
+
+class VirtualClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock()
+        # 10ms ticks on an 8 slot wheel, a turn takes 80ms
+        self.scheduler = Scheduler(tick=0.01, slots=8, clock=self.clock)
+        self.calls = []
+
+    def advance_to(self, offset: float):
+        self.clock.now = 1000.0 + offset
+        self.scheduler.advance()
+
+    def test_never_early(self):
+        self.scheduler.schedule(0.05, self.calls.append, 'a')
+
+        self.advance_to(0.049)
+        self.assertEqual(self.calls, [])
+        self.advance_to(0.05)
+        self.assertEqual(self.calls, ['a'])
+        self.advance_to(1)
+        self.assertEqual(self.calls, ['a'])
+
+    def test_zero_delay_runs_on_next_tick(self):
+        self.scheduler.schedule(0, self.calls.append, 'a')
+
+        self.advance_to(0)
+        self.assertEqual(self.calls, [])
+        self.advance_to(0.01)
+        self.assertEqual(self.calls, ['a'])
+
+    def test_slot_rollover(self):
+        # both land in slot 3, one turn apart
+        self.scheduler.schedule(0.03, self.calls.append, 'first')
+        self.scheduler.schedule(0.11, self.calls.append, 'second')
+
+        self.advance_to(0.03)
+        self.assertEqual(self.calls, ['first'])
+        self.advance_to(0.10)
+        self.assertEqual(self.calls, ['first'])
+        self.advance_to(0.11)
+        self.assertEqual(self.calls, ['first', 'second'])
+
+    def test_rounds_count_down_over_several_turns(self):
+        self.scheduler.schedule(0.35, self.calls.append, 'far')  # 4 turns and 3 slots away
+
+        for step in range(1, 35):  # every tick up to the one before
+            self.advance_to(step / 100)
+            self.assertEqual(self.calls, [], step)
+        self.advance_to(0.35)
+        self.assertEqual(self.calls, ['far'])
+
+    def test_jump_over_several_turns(self):
+        self.scheduler.schedule(0.35, self.calls.append, 'far')
+        self.scheduler.schedule(0.05, self.calls.append, 'near')
+        self.scheduler.schedule(2, self.calls.append, 'later')
+
+        self.advance_to(1)  # 12 turns at once
+        self.assertEqual(self.calls, ['near', 'far'])
+        self.advance_to(2)
+        self.assertEqual(self.calls, ['near', 'far', 'later'])
+
+    def test_cancel(self):
+        timer = self.scheduler.schedule(0.02, self.calls.append, 'cancelled')
+        self.scheduler.schedule(0.02, self.calls.append, 'kept')
+        timer.cancel()
+
+        self.advance_to(1)
+        self.assertEqual(self.calls, ['kept'])
+
+    def test_repeating_rearms_at_fixed_rate(self):
+        self.scheduler.schedule(0.1, lambda: self.calls.append(self.clock.now), period=0.1)
+
+        for step in range(1, 6):
+            self.advance_to(step / 10)
+        self.assertEqual(self.calls, [1000.1, 1000.2, 1000.3, 1000.4, 1000.5])
+
+    def test_repeating_overrun_skips_missed_periods(self):
+        self.scheduler.schedule(0.1, self.calls.append, 'tick', period=0.1)
+
+        self.advance_to(0.55)  # missed four periods, runs once
+        self.assertEqual(self.calls, ['tick'])
+        self.advance_to(0.64)
+        self.assertEqual(self.calls, ['tick'])
+        self.advance_to(0.65)
+        self.assertEqual(self.calls, ['tick', 'tick'])
+
+    def test_repeating_returned_delay(self):
+        delays = [0.3, None]
+
+        def backoff():
+            self.calls.append(self.clock.now)
+            return delays.pop(0) if delays else None
+
+        self.scheduler.schedule(0.1, backoff, period=0.1)
+        for step in range(1, 8):
+            self.advance_to(step / 10)
+        # backed off to 0.3s once, then the period again
+        self.assertEqual(self.calls, [1000.1, 1000.4, 1000.5, 1000.6, 1000.7])
+
+    def test_cancel_repeating_from_its_call(self):
+        timer = None
+
+        def once():
+            self.calls.append('once')
+            timer.cancel()
+
+        timer = self.scheduler.schedule(0.1, once, period=0.1)
+        self.advance_to(1)
+        self.advance_to(2)
+        self.assertEqual(self.calls, ['once'])
+
+    def test_failing_call_keeps_repeating(self):
+        def fail():
+            self.calls.append('fail')
+            raise ValueError('expected')
+
+        self.scheduler.schedule(0.1, fail, period=0.1)
+        self.advance_to(0.1)
+        self.advance_to(0.2)
+        self.assertEqual(self.calls, ['fail', 'fail'])
+
+    def test_blocking_runs_inline_without_worker(self):
+        self.scheduler.schedule(0.01, self.calls.append, 'blocking', blocking=True)
+
+        self.advance_to(0.01)
+        self.assertEqual(self.calls, ['blocking'])
+
+
+class TestSchedulerThreads(unittest.TestCase):
+    def test_blocking_call_does_not_delay_others(self):
+        scheduler = Scheduler()
+        scheduler.start()
+        try:
+            ticks = []
+            done = threading.Event()
+            scheduler.schedule(0.01, time.sleep, 0.5, blocking=True)
+            timer = scheduler.schedule(0, ticks.append, 1, period=0.01)
+            scheduler.schedule(0.1, done.set)
+
+            self.assertTrue(done.wait(0.4))
+            timer.cancel()
+            self.assertGreaterEqual(len(ticks), 5)
+        finally:
+            scheduler.stop(1)
+
+    def test_restart_keeps_timers(self):
+        scheduler = Scheduler()
+        scheduler.start()
+        scheduler.stop(1)
+
+        done = threading.Event()
+        scheduler.schedule(0.01, done.set)
+        self.assertFalse(done.wait(0.05))
+        scheduler.start()
+        try:
+            self.assertTrue(done.wait(1))
+        finally:
+            scheduler.stop(1)
+
+    def test_restart_after_stop_timed_out(self):
+        scheduler = Scheduler()
+        scheduler.start()
+        try:
+            running = threading.Event()
+            scheduler.schedule(0, lambda: running.set() or time.sleep(0.3), blocking=True)
+            self.assertTrue(running.wait(1))
+
+            worker = scheduler._worker
+            scheduler.stop(0.01)  # gives up on the blocking call
+            self.assertTrue(worker.is_alive())
+
+            scheduler.start()
+            # the worker of the previous start leaves once its call returns instead of running along the new one
+            worker.join(1)
+            self.assertFalse(worker.is_alive())
+
+            done = threading.Event()
+            scheduler.schedule(0.01, done.set, blocking=True)
+            self.assertTrue(done.wait(1))
+        finally:
+            scheduler.stop(1)
+
+
+if __name__ == '__main__':
+    unittest.main()